@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Write Batching Module
+=====================
+Coalesces small database writes into batched flushes.
+
+Usage:
+    from batching import MicroBatcher
+    
+    batcher = MicroBatcher(save_feedback_batch, max_items=50, max_delay=0.2)
+    batcher.put(row)                        # returns immediately
+    written, failed = await batcher.flush() # force out anything pending
+    await batcher.stop()                    # on shutdown
+"""
+
+import asyncio
+from typing import Any, Callable, Iterable, List, Tuple
+
+
+class MicroBatcher:
+    """
+    In-process write coalescer for the event loop.
+    
+    Items are buffered and handed to flush_fn as one list as soon as
+    max_items are pending or max_delay seconds have passed since the batch
+    started, whichever comes first. flush_fn is a blocking callable and
+    runs in a worker thread. A failed write is retried up to max_retries
+    times before its items are given up on and counted as failed.
+    """
+    
+    def __init__(self,
+                 flush_fn: Callable[[List[Any]], Any],
+                 max_items: int = 50,
+                 max_delay: float = 0.2,
+                 name: str = "batcher",
+                 max_retries: int = 2,
+                 retry_delay: float = 0.5):
+        """
+        Args:
+            flush_fn: Blocking function that writes a list of items
+            max_items: Flush as soon as this many items are pending
+            max_delay: Max seconds an item waits before being flushed
+            name: Label used in log messages
+            max_retries: Extra attempts for a batch whose write failed
+            retry_delay: Seconds before the first retry (grows linearly)
+        """
+        self.flush_fn = flush_fn
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.name = name
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.failed = 0  # Items dropped after exhausting retries, since start
+        
+        self._pending: List[Any] = []
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._task = None
+    
+    def put(self, item: Any) -> None:
+        """Queue an item for the next flush (must be called on the event loop)."""
+        self._pending.append(item)
+        if len(self._pending) >= self.max_items:
+            self._full.set()
+        self._wakeup.set()
+        
+        # Worker starts with the first item
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    def put_many(self, items: Iterable[Any]) -> None:
+        """Queue several items at once (must be called on the event loop)."""
+        for item in items:
+            self.put(item)
+    
+    @property
+    def pending(self) -> int:
+        """Number of items waiting to be flushed."""
+        return len(self._pending)
+    
+    async def flush(self) -> Tuple[int, int]:
+        """Write everything pending now. Returns (items written, items failed)."""
+        batch, self._pending = self._pending, []
+        self._wakeup.clear()
+        self._full.clear()
+        
+        # A burst can queue more than max_items before the worker runs
+        written = 0
+        for start in range(0, len(batch), self.max_items):
+            chunk = batch[start:start + self.max_items]
+            if await self._write(chunk):
+                written += len(chunk)
+        return written, len(batch) - written
+    
+    async def stop(self) -> Tuple[int, int]:
+        """Stop the worker and flush what is left (call on shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        result = await self.flush()
+        
+        # asyncio primitives bind to the loop that first waits on them; fresh
+        # ones let the batcher run again under a later loop (app restart)
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        return result
+    
+    async def _run(self):
+        """Flush on size or timeout, forever."""
+        while True:
+            await self._wakeup.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+    
+    async def _write(self, batch: List[Any]) -> bool:
+        """
+        Run flush_fn off the loop, retrying failures; one write at a time
+        keeps batches ordered. Returns True once the batch is written.
+        """
+        async with self._write_lock:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    await asyncio.sleep(self.retry_delay * attempt)
+                try:
+                    result = await asyncio.to_thread(self.flush_fn, batch)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                
+                # feedback_db helpers report failures as {"success": False, "error": ...}
+                if not (isinstance(result, dict) and not result.get("success", True)):
+                    return True
+                print(f"Warning: {self.name} flush of {len(batch)} items failed "
+                      f"(attempt {attempt + 1}/{self.max_retries + 1}): {result.get('error')}")
+            
+            self.failed += len(batch)
+            print(f"Warning: {self.name} dropped {len(batch)} items after {self.max_retries + 1} attempts")
+            return False
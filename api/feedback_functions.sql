@@ -0,0 +1,49 @@
+-- ============================================
+-- Supabase SQL functions for feedback_db.py
+-- ============================================
+-- Run once in the Supabase SQL editor (or via `supabase db push`).
+
+-- Aggregated vote counts used by get_feedback_stats().
+-- Returns one row per (predicted_class, user_vote) pair - at most ~6 rows -
+-- instead of shipping the whole feedback table to the API.
+create or replace function feedback_stats()
+returns table (predicted_class text, user_vote int, n bigint)
+language sql
+stable
+as $$
+    select coalesce(f.predicted_class, 'unknown'), f.user_vote, count(*)
+    from feedback f
+    group by 1, 2;
+$$;
+
+-- update_weight_adjustments_batch() upserts on feature_name, which needs a
+-- unique index on that column. Older databases can hold several rows per
+-- feature_name (the per-update insert path), so those are collapsed first,
+-- keeping the row with the most samples applied. Skipped entirely when a
+-- unique index on feature_name alone (e.g. the primary key) already exists;
+-- `create index if not exists` only compares index names and would add a
+-- redundant second index there.
+do $$
+begin
+    if not exists (
+        select 1
+        from pg_index i
+        join pg_attribute a on a.attrelid = i.indrelid and a.attnum = i.indkey[0]
+        where i.indrelid = 'weight_adjustments'::regclass
+          and i.indisunique
+          and i.indpred is null
+          and i.indnkeyatts = 1
+          and a.attname = 'feature_name'
+    ) then
+        delete from weight_adjustments w
+        where w.ctid not in (
+            select distinct on (feature_name) ctid
+            from weight_adjustments
+            order by feature_name, sample_count desc, last_updated desc nulls last
+        );
+        
+        create unique index weight_adjustments_feature_name_key
+            on weight_adjustments (feature_name);
+    end if;
+end
+$$;
@@ -10,6 +10,10 @@ Docs: http://localhost:8000/docs
 
 import sys
 import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Add execution directory to path
@@ -17,34 +21,87 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "execution"))
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
-import json
+import numpy as np
+import orjson
+from cachetools import TTLCache
 
 # Import execution modules
 from analyze_sentiment import SentimentAnalyzer
 from score_credibility import CredibilityScorer
 from detect_sarcasm import SarcasmDetector
 from calculate_weighted_rating import WeightedRatingCalculator
-from load_dataset import DatasetLoader
-from scrape_amazon import extract_asin, get_amazon_domain, build_review_url, AmazonScraper, scrape_with_firecrawl, scrape_with_scraperapi
-from adaptive_learner import get_learner
+from load_dataset import DatasetLoader, PYARROW_AVAILABLE
+from scrape_amazon import extract_asin, get_amazon_domain, build_review_url, AmazonScraper, scrape_with_firecrawl, scrape_with_scraperapi_async
+from adaptive_learner import get_learner, warm_kernels
+from review_features import prepare
 
 # Import feedback database (from api directory)
-from feedback_db import save_feedback, get_feedback_stats, get_class_adjustments
+from feedback_db import hash_text, build_feedback_row, save_feedback_batch, update_weight_adjustments_batch, get_feedback_stats, get_class_adjustments, close_client, invalidate_cache, SUPABASE_AVAILABLE
+from batching import MicroBatcher
 
 # Dataset path
 DATASET_PATH = Path(__file__).parent.parent / "data" / "Cell_Phones_and_Accessories_5.json.gz"
 dataset_loader = None  # Lazy loaded
+_dataset_lock = threading.Lock()
 
 # ============================================
 # App Setup
 # ============================================
 
+async def run_in_executor(func, *args):
+    """Run a blocking function on the analysis pool (app.state.executor)."""
+    return await asyncio.get_running_loop().run_in_executor(app.state.executor, func, *args)
+
+# Feedback rows are coalesced into one Supabase upsert per 200ms / 50 rows
+feedback_batcher = MicroBatcher(save_feedback_batch, max_items=50, max_delay=0.2, name="feedback")
+
+
+# Learner weight deltas: one read + one upsert per 50ms / 128 deltas. The
+# batch function retries its own writes against the values it read first;
+# retrying here would re-read and apply the deltas again
+weight_batcher = MicroBatcher(update_weight_adjustments_batch, max_items=128, max_delay=0.05,
+                              name="weights", max_retries=0)
+
+
+def _save_weights_backup(updates: list) -> None:
+    """Rewrite the learner's local JSON backup once for a run of feedback."""
+    get_learner().save_weights()
+
+# Local weights backup is debounced: one rewrite per 5s or 50 feedback updates
+weights_backup = MicroBatcher(_save_weights_backup, max_items=50, max_delay=5.0, name="weights-backup")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks."""
+    # Bounded pool for the CPU-bound analysis pipeline, so inference never
+    # runs on the event loop thread. Created per lifespan: shutdown below
+    # can't be undone, and the app may be started again in one process
+    app.state.executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="analyze")
+    # One synthetic review through the pipeline so singletons, learned weights,
+    # regexes and the numba kernels are ready before the first request. The transformer is the
+    # slow part; set WARM_MODELS=1 to load it here too.
+    await run_in_executor(warm_models, os.environ.get("WARM_MODELS") == "1")
+    yield
+    # Write out feedback and weight deltas still waiting in the batchers
+    await feedback_batcher.stop()
+    await weight_batcher.stop()
+    await weights_backup.stop()
+    app.state.executor.shutdown(wait=False, cancel_futures=True)
+    # Release pooled Supabase connections
+    close_client()
+
+
 app = FastAPI(
     title="TrueRate.ai API",
     description="Analyze product reviews for credibility, sentiment, and adjusted ratings",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # Faster encoding for the large batch/product payloads
 )
 
 # CORS for React frontend
@@ -56,10 +113,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize modules (singleton pattern)
-sentiment_analyzer = SentimentAnalyzer(mode="hybrid")  # Uses finetuned model when VADER confidence is low
-credibility_scorer = CredibilityScorer()
-sarcasm_detector = SarcasmDetector()
+# Streamed NDJSON goes out uncompressed: gzip would hold lines back until a
+# deflate block fills
+GZIP_EXCLUDED_PATHS = {"/analyze/url/stream"}
+
+
+class PathAwareGZipMiddleware:
+    """GZipMiddleware that skips the paths in GZIP_EXCLUDED_PATHS."""
+    
+    def __init__(self, app, **gzip_options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **gzip_options)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in GZIP_EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+
+# Compress large JSON bodies (batch/product/url results); small ones pass through
+app.add_middleware(PathAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Initialize modules (lazy singletons - built on first use)
+_models = {}
+_models_lock = threading.Lock()
+
+def _get_model(name: str, factory):
+    """Return the named singleton, creating it on first call (thread-safe)."""
+    model = _models.get(name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(name)
+            if model is None:
+                model = _models[name] = factory()
+    return model
+
+def get_sentiment_analyzer() -> SentimentAnalyzer:
+    # Uses finetuned model when VADER confidence is low; escalations from
+    # concurrent requests share transformer batches
+    return _get_model("sentiment", lambda: SentimentAnalyzer(mode="hybrid", coalesce=True))
+
+def get_credibility_scorer() -> CredibilityScorer:
+    return _get_model("credibility", CredibilityScorer)
+
+def get_sarcasm_detector() -> SarcasmDetector:
+    return _get_model("sarcasm", SarcasmDetector)
+
+WARM_TEXT = "Works fine, battery lasts about 2 days."
+
+def warm_models(load_transformer: bool = True) -> None:
+    """Build every model singleton and run one synthetic review through them."""
+    sentiment_analyzer = get_sentiment_analyzer()
+    if load_transformer and sentiment_analyzer.warm_up():
+        sentiment_analyzer.analyze_transformer(WARM_TEXT)
+    
+    features = prepare(WARM_TEXT)
+    sentiment_score = sentiment_analyzer.analyze_vader(WARM_TEXT).get("sentiment_score", 0.0)
+    get_credibility_scorer().score(WARM_TEXT, 3, sentiment_score, features=features)
+    get_sarcasm_detector().detect(WARM_TEXT, 3, sentiment_score, features=features)
+    
+    # Learner weights load (Supabase or backup file) here rather than on the
+    # first /feedback
+    get_learner().get_adjustment_factor(WARM_TEXT, 3, 0.5)
+    
+    # Dry runs so numba compiles (or loads its cache)
+    warm_kernels()
+    get_credibility_scorer().score_vec([WARM_TEXT], [3], [sentiment_score], features=[features])
+    rating_calculator.calculate_vec([3], [sentiment_score])
+    hash_text(WARM_TEXT)
+
 rating_calculator = WeightedRatingCalculator(star_weight=0.2, sentiment_weight=0.8)
 
 # ============================================
@@ -95,24 +218,28 @@ class BatchReviewInput(BaseModel):
 
 class SentimentResult(BaseModel):
     """Sentiment analysis result."""
+    model_config = ConfigDict(frozen=True)
     sentiment_score: float = Field(..., description="Sentiment from -1 (negative) to +1 (positive)")
     confidence: float
     model_used: str
 
 class CredibilityResult(BaseModel):
     """Credibility scoring result."""
+    model_config = ConfigDict(frozen=True)
     score: float = Field(..., description="Credibility from 0 (bot) to 1 (human)")
     classification: str = Field(..., description="bot, low_effort, or human")
     flags: list[str]
 
 class SarcasmResult(BaseModel):
     """Sarcasm detection result."""
+    model_config = ConfigDict(frozen=True)
     is_sarcastic: bool
     confidence: float
     triggers: list[str]
 
 class ReviewAnalysis(BaseModel):
     """Complete review analysis."""
+    model_config = ConfigDict(frozen=True)
     original_stars: int
     adjusted_rating: float
     rating_delta: float
@@ -183,6 +310,129 @@ async def root():
         "docs": "/docs"
     }
 
+# Reviews shorter than this (after strip) carry too little signal to be worth
+# a transformer pass; they are scored with VADER only
+MIN_ANALYZE_CHARS = 5
+
+# Fixed response keys, shared by every product/url analysis
+CLASS_KEYS = ("human", "low_effort", "bot")
+CLASS_CODES = {k: i for i, k in enumerate(CLASS_KEYS)}
+STAR_KEYS = ("1", "2", "3", "4", "5")
+
+def _credibility_distribution(class_codes: np.ndarray) -> dict:
+    """
+    Percentage of reviews per CLASS_KEYS class (CLASS_CODES array), 1 decimal.
+    
+    One np.round over the three shares; for count/total percentages it gives
+    the same values as round(x, 1) per class.
+    """
+    counts = np.bincount(class_codes, minlength=len(CLASS_KEYS))
+    return dict(zip(CLASS_KEYS, np.round(counts / len(class_codes) * 100, 1).tolist()))
+
+# In-process counters (exposed on /health)
+metrics = {"analyze_fast_path_total": 0, "analyze_cache_hits_total": 0, "scrape_cache_hits_total": 0}
+_metrics_lock = threading.Lock()
+
+def _incr(name: str, n: int = 1) -> None:
+    with _metrics_lock:
+        metrics[name] += n
+
+# Analysis results keyed by (hash_text(text), stars). The same reviews come
+# back often (re-scraped products, re-votes, retries). Accessed from executor
+# threads, so guarded by a threading lock.
+analysis_cache = TTLCache(maxsize=50_000, ttl=3600)
+_analysis_cache_lock = threading.Lock()
+
+def _cache_get(key):
+    with _analysis_cache_lock:
+        return analysis_cache.get(key)
+
+def _cache_put(key, analysis: dict) -> None:
+    with _analysis_cache_lock:
+        analysis_cache[key] = analysis
+
+def _analysis_dict(stars, adjusted_rating, rating_delta, sentiment_score,
+                   sentiment: dict, credibility: dict, sarcasm: dict) -> dict:
+    """Assemble pipeline outputs into the ReviewAnalysis shape (plain dict)."""
+    return {
+        "original_stars": stars,
+        "adjusted_rating": adjusted_rating,
+        "rating_delta": rating_delta,
+        "sentiment": {
+            "sentiment_score": sentiment_score,
+            "confidence": sentiment.get("confidence", 0.0),
+            "model_used": sentiment.get("model_used", "unknown")
+        },
+        "credibility": {
+            "score": credibility["score"],
+            "classification": credibility["classification"],
+            "flags": credibility["flags"]
+        },
+        "sarcasm": {
+            "is_sarcastic": sarcasm["is_sarcastic"],
+            "confidence": sarcasm["confidence"],
+            "triggers": sarcasm["triggers"]
+        }
+    }
+
+def _analyze_core(text: str, stars: int) -> dict:
+    """Run the single-review pipeline (blocking; called on the executor)."""
+    key = (hash_text(text), stars)
+    cached = _cache_get(key)
+    if cached is not None:
+        _incr("analyze_cache_hits_total")
+        return cached
+    
+    # Shared text views (strip/lower/split once for all three analyzers)
+    features = prepare(text)
+    
+    # Step 1: Sentiment
+    stripped_len = features.n_chars
+    if stripped_len < MIN_ANALYZE_CHARS:
+        # Fast path: never escalate trivial text to the transformer. Credibility
+        # and sarcasm still run (both cheap, and they short-circuit on such
+        # text themselves) so flags and aggregates stay the same.
+        _incr("analyze_fast_path_total")
+        if stripped_len < 2:
+            sentiment = {"sentiment_score": 0.0, "confidence": 0.0, "model_used": "none"}
+        else:
+            sentiment = get_sentiment_analyzer().analyze_vader(text)
+    else:
+        sentiment = get_sentiment_analyzer().analyze(text, features=features)
+    sentiment_score = sentiment.get("sentiment_score", 0.0)
+    
+    # Step 2: Credibility
+    credibility = get_credibility_scorer().score(
+        text=text,
+        stars=stars,
+        sentiment_score=sentiment_score,
+        features=features
+    )
+    
+    # Step 3: Sarcasm
+    sarcasm = get_sarcasm_detector().detect(
+        text=text,
+        stars=stars,
+        sentiment_score=sentiment_score,
+        features=features
+    )
+    
+    # Step 4: Weighted Rating
+    adjusted_rating = rating_calculator.calculate_rating(
+        stars=stars,
+        sentiment_score=sentiment_score,
+        credibility=credibility["score"],
+        is_sarcastic=sarcasm["is_sarcastic"],
+        sarcasm_confidence=sarcasm["confidence"]
+    )
+    
+    analysis = _analysis_dict(
+        stars, adjusted_rating, round(adjusted_rating - stars, 2),
+        sentiment_score, sentiment, credibility, sarcasm
+    )
+    _cache_put(key, analysis)
+    return analysis
+
 @app.post("/analyze", response_model=ReviewAnalysis)
 async def analyze_review(review: ReviewInput):
     """
@@ -191,84 +441,136 @@ async def analyze_review(review: ReviewInput):
     Returns sentiment, credibility, sarcasm detection, and adjusted rating.
     """
     try:
-        # Step 1: Sentiment
-        sentiment = sentiment_analyzer.analyze(review.text)
-        sentiment_score = sentiment.get("sentiment_score", 0.0)
-        
-        # Step 2: Credibility
-        credibility = credibility_scorer.score(
-            text=review.text,
-            stars=review.stars,
-            sentiment_score=sentiment_score
-        )
-        
-        # Step 3: Sarcasm
-        sarcasm = sarcasm_detector.detect(
-            text=review.text,
-            stars=review.stars,
-            sentiment_score=sentiment_score
-        )
-        
-        # Step 4: Weighted Rating
-        rating = rating_calculator.calculate(
-            stars=review.stars,
-            sentiment_score=sentiment_score,
-            credibility=credibility["score"],
-            is_sarcastic=sarcasm["is_sarcastic"],
-            sarcasm_confidence=sarcasm["confidence"]
-        )
-        
-        return ReviewAnalysis(
-            original_stars=review.stars,
-            adjusted_rating=rating["adjusted_rating"],
-            rating_delta=round(rating["adjusted_rating"] - review.stars, 2),
-            sentiment=SentimentResult(
-                sentiment_score=sentiment_score,
-                confidence=sentiment.get("confidence", 0.0),
-                model_used=sentiment.get("model_used", "unknown")
-            ),
-            credibility=CredibilityResult(
-                score=credibility["score"],
-                classification=credibility["classification"],
-                flags=credibility["flags"]
-            ),
-            sarcasm=SarcasmResult(
-                is_sarcastic=sarcasm["is_sarcastic"],
-                confidence=sarcasm["confidence"],
-                triggers=sarcasm["triggers"]
-            )
-        )
+        # Plain dict; FastAPI validates it once against response_model
+        return await run_in_executor(_analyze_core, review.text, review.stars)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _analyze_many(texts: list[str], stars: list[int]) -> list[dict]:
+    """
+    Run the full pipeline over many reviews at once.
+    
+    Cached reviews are served from analysis_cache; only the misses go
+    through _run_pipeline. Returns dicts shaped like ReviewAnalysis.
+    """
+    keys = [(hash_text(text), star) for text, star in zip(texts, stars)]
+    results = [_cache_get(key) for key in keys]
+    misses = [i for i, result in enumerate(results) if result is None]
+    _incr("analyze_cache_hits_total", len(results) - len(misses))
+    
+    if misses:
+        # Repeats within the batch are analyzed once (like cache hits, they
+        # share the cached dict)
+        unique = {}
+        for i in misses:
+            unique.setdefault(keys[i], i)
+        first = list(unique.values())
+        analyses = _run_pipeline([texts[i] for i in first], [stars[i] for i in first])
+        for key, analysis in zip(unique, analyses):
+            _cache_put(key, analysis)
+            unique[key] = analysis
+        for i in misses:
+            results[i] = unique[keys[i]]
+    
+    return results
+
+def _run_pipeline(texts: list[str], stars: list[int]) -> list[dict]:
+    """
+    Batched pipeline (no cache).
+    
+    Sentiment goes through one batched call (so the transformer sees all
+    escalated texts in a single forward pass); trivial texts take the same
+    VADER-only fast path as /analyze. Credibility and rating are computed
+    on NumPy arrays.
+    """
+    stars_arr = np.asarray(stars, dtype=np.int64)
+    
+    # Shared text views (strip/lower/split once for all three analyzers)
+    features = [prepare(text) for text in texts]
+    
+    # Step 1: Sentiment (batched)
+    sentiment_analyzer = get_sentiment_analyzer()
+    trivial = [f.n_chars < MIN_ANALYZE_CHARS for f in features]
+    sentiments = [None] * len(texts)
+    full = [i for i, is_trivial in enumerate(trivial) if not is_trivial]
+    for i, result in zip(full, sentiment_analyzer.analyze_batch([texts[i] for i in full], show_progress=False)):
+        sentiments[i] = result
+    for i, is_trivial in enumerate(trivial):
+        if is_trivial:
+            sentiments[i] = (
+                sentiment_analyzer.analyze_vader(texts[i]) if features[i].n_chars >= 2
+                else {"sentiment_score": 0.0, "confidence": 0.0, "model_used": "none"}
+            )
+    _incr("analyze_fast_path_total", len(texts) - len(full))
+    sentiment_scores = np.array([s.get("sentiment_score", 0.0) for s in sentiments], dtype=np.float64)
+    
+    # Step 2: Credibility (struct of arrays)
+    credibility = get_credibility_scorer().score_vec(texts, stars_arr, sentiment_scores, features=features)
+    credibilities = [
+        {"score": score, "classification": classification, "flags": flags}
+        for score, classification, flags in zip(
+            credibility["scores"].tolist(), credibility["classifications"].tolist(), credibility["flags"]
+        )
+    ]
+    
+    # Step 3: Sarcasm
+    sarcasm_detector = get_sarcasm_detector()
+    sarcasms = [
+        sarcasm_detector.detect(text=text, stars=star, sentiment_score=sentiment_score, features=f)
+        for text, star, sentiment_score, f in zip(texts, stars_arr.tolist(), sentiment_scores.tolist(), features)
+    ]
+    
+    # Step 4: Weighted rating (vectorized)
+    adjusted = rating_calculator.calculate_vec(
+        stars=stars_arr,
+        sentiment_scores=sentiment_scores,
+        credibility=credibility["scores"],
+        is_sarcastic=[s["is_sarcastic"] for s in sarcasms],
+        sarcasm_confidence=[s["confidence"] for s in sarcasms]
+    )
+    deltas = np.round(adjusted - stars_arr, 2)
+    
+    return [
+        _analysis_dict(star, adjusted_rating, delta, sentiment_score, sentiment, credibility, sarcasm)
+        for star, adjusted_rating, delta, sentiment_score, sentiment, credibility, sarcasm in zip(
+            stars_arr.tolist(), adjusted.tolist(), deltas.tolist(), sentiment_scores.tolist(),
+            sentiments, credibilities, sarcasms
+        )
+    ]
+
 @app.post("/analyze/batch")
 async def analyze_batch(batch: BatchReviewInput):
     """
     Analyze multiple reviews and return aggregated statistics.
     """
-    results = []
+    texts = [review.text for review in batch.reviews]
+    stars = [review.stars for review in batch.reviews]
     
-    for review in batch.reviews:
-        analysis = await analyze_review(review)
-        results.append({
-            "input": {"text": review.text, "stars": review.stars},
-            "analysis": analysis.model_dump()
-        })
+    try:
+        # CPU-bound pipeline runs off the event loop
+        analyses = await run_in_executor(_analyze_many, texts, stars)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    results = [
+        {"input": {"text": text, "stars": star}, "analysis": analysis}
+        for text, star, analysis in zip(texts, stars, analyses)
+    ]
     
     # Calculate aggregates
     if results:
-        original_ratings = [r["input"]["stars"] for r in results]
-        adjusted_ratings = [r["analysis"]["adjusted_rating"] for r in results]
-        classifications = [r["analysis"]["credibility"]["classification"] for r in results]
+        original_ratings = np.asarray(stars)
+        adjusted_ratings = np.array([a["adjusted_rating"] for a in analyses])
+        classifications = [a["credibility"]["classification"] for a in analyses]
         
         summary = {
             "total_reviews": len(results),
-            "original_average": round(sum(original_ratings) / len(original_ratings), 2),
-            "adjusted_average": round(sum(adjusted_ratings) / len(adjusted_ratings), 2),
+            "original_average": round(float(original_ratings.mean()), 2),
+            "adjusted_average": round(float(adjusted_ratings.mean()), 2),
             "bot_count": classifications.count("bot"),
             "low_effort_count": classifications.count("low_effort"),
             "human_count": classifications.count("human"),
-            "sarcasm_count": sum(1 for r in results if r["analysis"]["sarcasm"]["is_sarcastic"])
+            "sarcasm_count": sum(1 for a in analyses if a["sarcasm"]["is_sarcastic"])
         }
     else:
         summary = {}
@@ -292,25 +594,36 @@ async def get_config():
 # Product Analysis Endpoints
 # ============================================
 
-def get_dataset():
-    """Lazy load the dataset."""
+def _load_dataset() -> DatasetLoader:
+    """Load the dataset once (blocking; concurrent first callers wait on the lock)."""
     global dataset_loader
-    if dataset_loader is None:
-        if DATASET_PATH.exists():
-            dataset_loader = DatasetLoader(str(DATASET_PATH))
-            # Load first 100k reviews for faster startup (remove limit for full dataset)
-            dataset_loader.load(max_reviews=100000, show_progress=True)
-        else:
-            raise HTTPException(status_code=404, detail=f"Dataset not found: {DATASET_PATH}")
+    with _dataset_lock:
+        if dataset_loader is None:
+            loader = DatasetLoader(str(DATASET_PATH))
+            # The review store serves the full dataset without decoding it up front;
+            # without pyarrow, load first 100k reviews for faster startup
+            loader.load(max_reviews=None if PYARROW_AVAILABLE else 100000, show_progress=True)
+            dataset_loader = loader
     return dataset_loader
 
+async def get_dataset() -> DatasetLoader:
+    """
+    Lazy load the dataset. The first load parses the JSONL and builds the
+    review store, which can take minutes, so it runs off the event loop.
+    """
+    if dataset_loader is not None:
+        return dataset_loader
+    if not DATASET_PATH.exists():
+        raise HTTPException(status_code=404, detail=f"Dataset not found: {DATASET_PATH}")
+    return await run_in_executor(_load_dataset)
+
 @app.get("/products")
 async def list_products(limit: int = 20):
     """
     List available products sorted by review count.
     """
     try:
-        loader = get_dataset()
+        loader = await get_dataset()
         products = loader.search_products(limit=limit)
         stats = loader.get_stats()
         return {
@@ -326,7 +639,7 @@ async def get_product_info(product_id: str):
     Get basic info for a product.
     """
     try:
-        loader = get_dataset()
+        loader = await get_dataset()
         product = loader.get_product(product_id)
         if not product:
             raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
@@ -336,80 +649,75 @@ async def get_product_info(product_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _analyze_product_reviews(product_id: str, reviews: list[dict]) -> ProductAnalysisResult:
+    """
+    Score every review of a product and aggregate the truth gap.
+    
+    Reviews go through the cached batch pipeline (_analyze_many); per-review
+    fields are kept as typed arrays and distributions use bincount.
+    """
+    texts = [r["text"] for r in reviews]
+    stars = np.fromiter((r["stars"] for r in reviews), dtype=np.int8, count=len(reviews))
+    
+    n = len(reviews)
+    
+    # Cached reviews skip inference; the rest go through one batched pipeline
+    analyses = _analyze_many(texts, stars.tolist())
+    
+    # Per-review fields as flat typed arrays (classification as CLASS_KEYS index)
+    adjusted = np.fromiter((a["adjusted_rating"] for a in analyses), dtype=np.float64, count=n)
+    class_codes = np.fromiter(
+        (CLASS_CODES[a["credibility"]["classification"]] for a in analyses), dtype=np.int8, count=n
+    )
+    is_sarcastic = np.fromiter((a["sarcasm"]["is_sarcastic"] for a in analyses), dtype=bool, count=n)
+    
+    # Track stats
+    credibility_distribution = _credibility_distribution(class_codes)
+    rating_dist = np.bincount(stars, minlength=6)[1:6].tolist()
+    
+    sample_reviews = [
+        {
+            "original_stars": int(stars[i]),
+            "adjusted_rating": float(adjusted[i]),
+            "text_preview": texts[i][:100] + "..." if len(texts[i]) > 100 else texts[i],
+            "credibility": CLASS_KEYS[class_codes[i]],
+            "is_sarcastic": bool(is_sarcastic[i])
+        }
+        for i in range(min(n, 10))  # Top 10 for preview
+    ]
+    
+    # Calculate aggregates
+    original_avg = float(stars.mean())
+    adjusted_avg = float(adjusted.mean())
+    
+    return ProductAnalysisResult(
+        product_id=product_id,
+        review_count=n,
+        original_average=round(original_avg, 2),
+        adjusted_average=round(adjusted_avg, 2),
+        truth_gap=round(adjusted_avg - original_avg, 2),
+        bot_percentage=credibility_distribution["bot"],
+        credibility_distribution=credibility_distribution,
+        rating_distribution=dict(zip(STAR_KEYS, rating_dist)),
+        sample_reviews=sample_reviews
+    )
+
 @app.post("/analyze/product", response_model=ProductAnalysisResult)
 async def analyze_product(request: ProductAnalysisInput):
     """
     Analyze all reviews for a product and return aggregate truth gap analysis.
     """
     try:
-        loader = get_dataset()
-        product = loader.get_product(request.product_id)
+        loader = await get_dataset()
+        product = loader.get_product(request.product_id, max_reviews=request.max_reviews)
         
         if not product:
             raise HTTPException(status_code=404, detail=f"Product {request.product_id} not found")
         
         reviews = product["reviews"][:request.max_reviews]
         
-        # Analyze each review
-        results = []
-        classifications = {"bot": 0, "low_effort": 0, "human": 0}
-        rating_dist = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        
-        for review in reviews:
-            sentiment = sentiment_analyzer.analyze(review["text"])
-            sentiment_score = sentiment.get("sentiment_score", 0.0)
-            
-            credibility = credibility_scorer.score(
-                text=review["text"],
-                stars=review["stars"],
-                sentiment_score=sentiment_score
-            )
-            
-            sarcasm = sarcasm_detector.detect(
-                text=review["text"],
-                stars=review["stars"],
-                sentiment_score=sentiment_score
-            )
-            
-            rating = rating_calculator.calculate(
-                stars=review["stars"],
-                sentiment_score=sentiment_score,
-                credibility=credibility["score"],
-                is_sarcastic=sarcasm["is_sarcastic"],
-                sarcasm_confidence=sarcasm["confidence"]
-            )
-            
-            # Track stats
-            classifications[credibility["classification"]] += 1
-            rating_dist[review["stars"]] += 1
-            
-            results.append({
-                "original_stars": review["stars"],
-                "adjusted_rating": rating["adjusted_rating"],
-                "text_preview": review["text"][:100] + "..." if len(review["text"]) > 100 else review["text"],
-                "credibility": credibility["classification"],
-                "is_sarcastic": sarcasm["is_sarcastic"]
-            })
-        
-        # Calculate aggregates
-        original_avg = sum(r["original_stars"] for r in results) / len(results)
-        adjusted_avg = sum(r["adjusted_rating"] for r in results) / len(results)
-        
-        return ProductAnalysisResult(
-            product_id=request.product_id,
-            review_count=len(results),
-            original_average=round(original_avg, 2),
-            adjusted_average=round(adjusted_avg, 2),
-            truth_gap=round(adjusted_avg - original_avg, 2),
-            bot_percentage=round(classifications["bot"] / len(results) * 100, 1),
-            credibility_distribution={
-                "human": round(classifications["human"] / len(results) * 100, 1),
-                "low_effort": round(classifications["low_effort"] / len(results) * 100, 1),
-                "bot": round(classifications["bot"] / len(results) * 100, 1)
-            },
-            rating_distribution={str(k): v for k, v in rating_dist.items()},
-            sample_reviews=results[:10]  # Top 10 for preview
-        )
+        # CPU-bound pipeline runs off the event loop
+        return await run_in_executor(_analyze_product_reviews, request.product_id, reviews)
         
     except HTTPException:
         raise
@@ -429,6 +737,7 @@ async def health_check():
             "rating_calculator": "ok",
             "adaptive_learner": "ok"
         },
+        "metrics": dict(metrics),
         "learning_stats": learner.get_stats()
     }
 
@@ -465,36 +774,40 @@ async def submit_feedback(feedback: FeedbackInput):
     Use user_vote=-1 if user thinks classification is wrong (👎).
     
     This feedback is used to improve the model over time.
+    Rows are queued and written to the database in batches, so success
+    here is optimistic.
     """
     try:
-        # Save to database
-        result = save_feedback(
+        if not SUPABASE_AVAILABLE:
+            raise HTTPException(status_code=500, detail="Supabase not available")
+        
+        # Queue for the next batched upsert
+        row = build_feedback_row(
             text=feedback.text,
             stars=feedback.stars,
             predicted_class=feedback.predicted_class,
             user_vote=feedback.user_vote,
             predicted_score=feedback.predicted_score
         )
+        feedback_batcher.put(row)
         
-        if not result.get("success"):
-            raise HTTPException(status_code=500, detail=result.get("error", "Failed to save feedback"))
-        
-        # Update adaptive learner
+        # Update adaptive learner in memory; the deltas are persisted by the
+        # weight batcher and the local backup is rewritten on a debounce
         learner = get_learner()
         adjustments = learner.update_from_feedback(
             text=feedback.text,
             stars=feedback.stars,
             predicted_class=feedback.predicted_class,
-            user_vote=feedback.user_vote
+            user_vote=feedback.user_vote,
+            persist=False
         )
-        
-        # Save learned weights periodically
-        learner.save_weights()
+        weight_batcher.put_many(adjustments.items())
+        weights_backup.put(len(adjustments))
         
         return {
             "success": True,
             "message": "Thank you for your feedback!",
-            "text_hash": result.get("text_hash"),
+            "text_hash": row["text_hash"],
             "adjustments_applied": len(adjustments)
         }
     except HTTPException:
@@ -503,6 +816,30 @@ async def submit_feedback(feedback: FeedbackInput):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/feedback/flush")
+async def flush_feedback():
+    """
+    Write queued feedback and weight deltas to the database now instead of
+    waiting for the batch window. Responds 503 with success False if any
+    write still failed after retries (those items are not persisted).
+    """
+    flushed, failed = await feedback_batcher.flush()
+    weights_flushed, weights_failed = await weight_batcher.flush()
+    _, backup_failed = await weights_backup.flush()
+    
+    result = {
+        "success": not (failed or weights_failed or backup_failed),
+        "flushed": flushed,
+        "weights_flushed": weights_flushed,
+        "failed": failed,
+        "weights_failed": weights_failed,
+        "weights_backup_failed": backup_failed > 0
+    }
+    if not result["success"]:
+        return ORJSONResponse(status_code=503, content=result)
+    return result
+
+
 @app.get("/feedback/stats")
 async def get_feedback_statistics():
     """
@@ -521,6 +858,245 @@ async def get_feedback_statistics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/feedback/invalidate")
+async def invalidate_feedback_cache():
+    """
+    Clear cached feedback aggregates (class/weight adjustments).
+    
+    Call after a write to make fresh state visible before the TTL expires.
+    """
+    invalidate_cache()
+    return {"success": True, "message": "Feedback cache cleared"}
+
+
+# Scraped reviews keyed by (asin, domain): (reviews, product_title, method).
+# A scrape costs provider credits and several seconds, and the same product
+# is often analyzed repeatedly. Only touched on the event loop, so no lock.
+SCRAPE_CACHE_TTL_SECONDS = 3600
+scrape_cache = TTLCache(maxsize=500, ttl=SCRAPE_CACHE_TTL_SECONDS)
+
+# ScraperAPI review pages fetched per product (about 10 reviews and one
+# credit each); they are requested concurrently, so extra pages add credits
+# but little latency
+SCRAPERAPI_PAGES = max(1, int(os.environ.get("SCRAPERAPI_PAGES", "1")))
+
+async def _scrape_scraperapi(asin: str, domain: str) -> Optional[tuple]:
+    """ScraperAPI structured reviews as (reviews, product_title, method), or None."""
+    print(f"Trying ScraperAPI for ASIN: {asin}, domain: {domain}")
+    reviews = await scrape_with_scraperapi_async(asin, domain, pages=SCRAPERAPI_PAGES)
+    if not reviews:
+        return None
+    print(f"ScraperAPI returned {len(reviews)} reviews")
+    return reviews, None, "scraperapi"
+
+def _scrape_firecrawl(review_url: str) -> Optional[tuple]:
+    """Firecrawl-fetched review page parsed as (reviews, product_title, method), or None."""
+    print(f"Trying Firecrawl for: {review_url}")
+    scraped_html = scrape_with_firecrawl(review_url)
+    if not scraped_html:
+        return None
+    scraper = AmazonScraper()
+    reviews = scraper.scrape_reviews_from_html(scraped_html)
+    if not reviews:
+        return None
+    product_title = scraper.get_product_info_from_html(scraped_html).get('title')
+    return reviews, product_title, "firecrawl"
+
+async def _scrape_reviews(asin: str, domain: str, review_url: str) -> Optional[tuple]:
+    """
+    Run both scrapers concurrently and return the first non-empty result.
+    
+    ScraperAPI fetches its pages concurrently on the event loop; Firecrawl
+    blocks on network I/O, so it runs on the default thread pool rather than
+    the analysis executor. If both finish together ScraperAPI wins, as it did
+    when it was tried first. The loser is cancelled (a Firecrawl request
+    already in flight still completes in its thread, but its result is
+    dropped).
+    """
+    tasks = {
+        asyncio.ensure_future(_scrape_scraperapi(asin, domain)): 0,
+        asyncio.ensure_future(asyncio.to_thread(_scrape_firecrawl, review_url)): 1,
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=tasks.get):
+                try:
+                    result = task.result()
+                except Exception as e:
+                    print(f"Warning: scraper failed: {e}")
+                    continue
+                if result:
+                    return result
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+def _analyze_scraped_review(review: dict) -> tuple:
+    """
+    Score one scraped review for /analyze/url.
+    
+    review is a _analyzable_reviews dict. Returns (review, text, stars,
+    adjusted_rating, classification, is_sarcastic); display dicts are built
+    only for the sample.
+    """
+    stars = review['stars']
+    text = review['text']
+    
+    features = prepare(text)
+    sentiment = get_sentiment_analyzer().analyze(text, features=features)
+    credibility = get_credibility_scorer().score(text, stars, features=features)
+    sarcasm = get_sarcasm_detector().detect(text, features=features)
+    adjusted = rating_calculator.calculate_rating(stars, sentiment['sentiment_score'])
+    
+    return (review, text, stars, adjusted, credibility['classification'], sarcasm['is_sarcastic'])
+
+@app.get("/scrape/cache")
+async def scrape_cache_info():
+    """Scrape cache occupancy (entries are (asin, domain) pairs)."""
+    return {
+        "size": len(scrape_cache),
+        "maxsize": scrape_cache.maxsize,
+        "ttl_seconds": SCRAPE_CACHE_TTL_SECONDS,
+        "hits": metrics["scrape_cache_hits_total"]
+    }
+
+@app.post("/scrape/cache/clear")
+async def clear_scrape_cache():
+    """Drop cached scrapes so the next /analyze/url fetches fresh reviews."""
+    cleared = len(scrape_cache)
+    scrape_cache.clear()
+    return {"success": True, "cleared": cleared}
+
+async def _resolve_url_reviews(request: UrlAnalysisInput) -> tuple[dict, list]:
+    """
+    Find reviews for an Amazon URL: pasted HTML, then the scrape cache, then
+    the scraper race.
+    
+    Returns (context, reviews): context holds asin/domain/review_url/
+    product_title/scrape_method; reviews is limited to max_reviews and empty
+    if nothing could be scraped.
+    """
+    # Extract ASIN
+    asin = extract_asin(request.url)
+    if not asin:
+        raise HTTPException(status_code=400, detail="Could not extract ASIN from URL")
+    
+    domain = get_amazon_domain(request.url)
+    review_url = build_review_url(asin, domain)
+    
+    # Parse reviews from HTML if provided
+    reviews = []
+    product_title = None
+    scrape_method = "browser"
+    
+    if request.html_content:
+        scraper = AmazonScraper()
+        reviews = scraper.scrape_reviews_from_html(request.html_content)
+        product_info = scraper.get_product_info_from_html(request.html_content)
+        product_title = product_info.get('title')
+        scrape_method = "manual_html"
+        if reviews:
+            scrape_cache[(asin, domain)] = (reviews, product_title, scrape_method)
+    
+    # Reuse a recent scrape of the same product
+    if not reviews:
+        cached = scrape_cache.get((asin, domain))
+        if cached:
+            reviews, product_title, scrape_method = cached
+            _incr("scrape_cache_hits_total")
+    
+    # Otherwise race ScraperAPI and Firecrawl
+    if not reviews:
+        scraped = await _scrape_reviews(asin, domain, review_url)
+        if scraped:
+            reviews, product_title, scrape_method = scraped
+            scrape_cache[(asin, domain)] = scraped
+    
+    context = {
+        "asin": asin,
+        "domain": domain,
+        "review_url": review_url,
+        "product_title": product_title,
+        "scrape_method": scrape_method
+    }
+    return context, reviews[:request.max_reviews]
+
+def _pending_html_response(context: dict) -> dict:
+    """Ask the client to fetch the review page itself when scraping failed."""
+    return {
+        "asin": context["asin"],
+        "domain": context["domain"],
+        "review_url": context["review_url"],
+        "status": "pending_html",
+        "message": "Automated scraping unavailable. Please copy the HTML from the review page manually.",
+        "instructions": [
+            "1. Click the review_url link above to open the Amazon reviews page",
+            "2. Right-click on the page and select 'View Page Source' or press Ctrl+U",
+            "3. Select all (Ctrl+A) and copy (Ctrl+C) the HTML",
+            "4. Paste it when prompted"
+        ]
+    }
+
+def _analyzable_reviews(reviews: list) -> list:
+    """
+    Drop reviews too short to analyze (before submitting any work) and
+    normalize the rest to {stars (int), text, title, verified}.
+    """
+    reviews = [
+        {
+            'stars': int(r.get('stars', 3)),
+            'text': r['text'],
+            'title': r.get('title', ''),
+            'verified': r.get('verified', False)
+        }
+        for r in reviews if len(r.get('text') or '') >= 10
+    ]
+    if not reviews:
+        raise HTTPException(status_code=400, detail="No valid reviews found in HTML")
+    return reviews
+
+def _url_review_dict(result: tuple) -> dict:
+    """Display dict for one _analyze_scraped_review result."""
+    review, text, stars, adjusted, classification, is_sarcastic = result
+    return {
+        "original_stars": stars,
+        "adjusted_rating": round(adjusted, 2),
+        "title": review['title'],
+        "text": text[:200] + '...' if len(text) > 200 else text,
+        "credibility": classification,
+        "is_sarcastic": is_sarcastic,
+        "verified": review['verified']
+    }
+
+def _url_summary(context: dict, results: list) -> dict:
+    """Truth gap aggregates over every analyzed review (results in input order)."""
+    # Calculate aggregates in one pass over typed arrays
+    total = len(results)
+    stars = np.fromiter((r[2] for r in results), dtype=np.int64, count=total)
+    adjusted = np.fromiter((r[3] for r in results), dtype=np.float64, count=total)
+    class_codes = np.fromiter((CLASS_CODES[r[4]] for r in results), dtype=np.int8, count=total)
+    credibility_distribution = _credibility_distribution(class_codes)
+    original_avg = float(stars.mean())
+    adjusted_avg = float(adjusted.mean())
+    
+    return {
+        "asin": context["asin"],
+        "domain": context["domain"],
+        "review_url": context["review_url"],
+        "product_title": context["product_title"],
+        "review_count": total,
+        "original_average": round(original_avg, 2),
+        "adjusted_average": round(adjusted_avg, 2),
+        "truth_gap": round(adjusted_avg - original_avg, 2),
+        "bot_percentage": credibility_distribution['bot'],
+        "credibility_distribution": credibility_distribution,
+        "sample_reviews": [_url_review_dict(r) for r in results[:10]],
+        "scrape_method": context["scrape_method"]
+    }
+
 @app.post("/analyze/url")
 async def analyze_amazon_url(request: UrlAnalysisInput):
     """
@@ -533,126 +1109,74 @@ async def analyze_amazon_url(request: UrlAnalysisInput):
     4. Return truth gap analysis
     """
     try:
-        # Extract ASIN
-        asin = extract_asin(request.url)
-        if not asin:
-            raise HTTPException(status_code=400, detail="Could not extract ASIN from URL")
-        
-        domain = get_amazon_domain(request.url)
-        review_url = build_review_url(asin, domain)
-        
-        # Parse reviews from HTML if provided
-        reviews = []
-        product_title = None
-        scrape_method = "browser"
-        
-        if request.html_content:
-            scraper = AmazonScraper()
-            reviews = scraper.scrape_reviews_from_html(request.html_content)
-            product_info = scraper.get_product_info_from_html(request.html_content)
-            product_title = product_info.get('title')
-            scrape_method = "manual_html"
-        
-        # If no HTML provided, try ScraperAPI first (best for Amazon - handles CAPTCHAs)
-        if not reviews:
-            print(f"Trying ScraperAPI for ASIN: {asin}, domain: {domain}")
-            scraperapi_reviews = scrape_with_scraperapi(asin, domain)
-            if scraperapi_reviews:
-                reviews = scraperapi_reviews
-                scrape_method = "scraperapi"
-                print(f"ScraperAPI returned {len(reviews)} reviews")
-        
-        # Fallback to Firecrawl if ScraperAPI failed
-        if not reviews:
-            print(f"Trying Firecrawl for: {review_url}")
-            scraped_html = scrape_with_firecrawl(review_url)
-            if scraped_html:
-                scraper = AmazonScraper()
-                reviews = scraper.scrape_reviews_from_html(scraped_html)
-                product_info = scraper.get_product_info_from_html(scraped_html)
-                product_title = product_info.get('title')
-                scrape_method = "firecrawl"
-        
+        context, reviews = await _resolve_url_reviews(request)
         if not reviews:
             # Return the review URL for browser to fetch
-            return {
-                "asin": asin,
-                "domain": domain,
-                "review_url": review_url,
-                "status": "pending_html",
-                "message": "Automated scraping unavailable. Please copy the HTML from the review page manually.",
-                "instructions": [
-                    "1. Click the review_url link above to open the Amazon reviews page",
-                    "2. Right-click on the page and select 'View Page Source' or press Ctrl+U",
-                    "3. Select all (Ctrl+A) and copy (Ctrl+C) the HTML",
-                    "4. Paste it when prompted"
-                ]
-            }
-        
-        # Limit reviews
-        reviews = reviews[:request.max_reviews]
-        
-        # Analyze each review
-        results = []
-        credibility_counts = {"human": 0, "low_effort": 0, "bot": 0}
-        
-        for review in reviews:
-            stars = int(review.get('stars', 3))
-            text = review.get('text', '')
-            
-            if not text or len(text) < 10:
-                continue
-            
-            # Run analysis
-            sentiment = sentiment_analyzer.analyze(text)
-            credibility = credibility_scorer.score(text, stars)
-            sarcasm = sarcasm_detector.detect(text)
-            adjusted = rating_calculator.calculate(stars, sentiment['sentiment_score'])
-            
-            credibility_counts[credibility['classification']] += 1
-            
-            results.append({
-                "original_stars": stars,
-                "adjusted_rating": round(adjusted, 2),
-                "title": review.get('title', ''),
-                "text": text[:200] + '...' if len(text) > 200 else text,
-                "credibility": credibility['classification'],
-                "is_sarcastic": sarcasm['is_sarcastic'],
-                "verified": review.get('verified', False)
-            })
-        
-        if not results:
-            raise HTTPException(status_code=400, detail="No valid reviews found in HTML")
+            return _pending_html_response(context)
+        reviews = _analyzable_reviews(reviews)
         
-        # Calculate aggregates
-        original_avg = sum(r['original_stars'] for r in results) / len(results)
-        adjusted_avg = sum(r['adjusted_rating'] for r in results) / len(results)
-        total = len(results)
+        # Analyze reviews concurrently on the analysis pool (gather keeps input order)
+        results = await asyncio.gather(
+            *(run_in_executor(_analyze_scraped_review, review) for review in reviews)
+        )
         
-        return {
-            "asin": asin,
-            "domain": domain,
-            "review_url": review_url,
-            "product_title": product_title,
-            "review_count": total,
-            "original_average": round(original_avg, 2),
-            "adjusted_average": round(adjusted_avg, 2),
-            "truth_gap": round(adjusted_avg - original_avg, 2),
-            "bot_percentage": round(credibility_counts['bot'] / total * 100, 1),
-            "credibility_distribution": {
-                "human": round(credibility_counts['human'] / total * 100, 1),
-                "low_effort": round(credibility_counts['low_effort'] / total * 100, 1),
-                "bot": round(credibility_counts['bot'] / total * 100, 1)
-            },
-            "sample_reviews": results[:10],
-            "scrape_method": scrape_method
-        }
+        return _url_summary(context, results)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _ndjson(record: dict) -> bytes:
+    """One NDJSON line."""
+    return orjson.dumps(record) + b"\n"
+
+@app.post("/analyze/url/stream")
+async def analyze_amazon_url_stream(request: UrlAnalysisInput):
+    """
+    Streaming variant of /analyze/url (application/x-ndjson).
+    
+    Emits a {"type": "meta"} line as soon as reviews are found, one
+    {"type": "review", "index": i, ...} line per review as its analysis
+    completes (completion order, index = position in the input), then a
+    {"type": "summary"} line with the same fields /analyze/url returns.
+    Scraping failures are reported before streaming starts, exactly as in
+    /analyze/url.
+    """
+    try:
+        context, reviews = await _resolve_url_reviews(request)
+        if not reviews:
+            return _pending_html_response(context)
+        reviews = _analyzable_reviews(reviews)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def analyze_indexed(i: int, review: dict):
+        return i, await run_in_executor(_analyze_scraped_review, review)
+    
+    tasks = [asyncio.ensure_future(analyze_indexed(i, r)) for i, r in enumerate(reviews)]
+    
+    async def generate():
+        results = [None] * len(tasks)
+        try:
+            yield _ndjson({"type": "meta", **context, "review_count": len(tasks)})
+            for next_done in asyncio.as_completed(tasks):
+                i, result = await next_done
+                results[i] = result
+                yield _ndjson({"type": "review", "index": i, **_url_review_dict(result)})
+            yield _ndjson({"type": "summary", **_url_summary(context, results)})
+        except Exception as e:
+            yield _ndjson({"type": "error", "detail": str(e)})
+        finally:
+            # Client went away mid-stream: don't leave queued analyses behind
+            for task in tasks:
+                task.cancel()
+    
+    # Not gzipped (GZIP_EXCLUDED_PATHS), so each line reaches the client as it's ready
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 # ============================================
 # Run Server
 # ============================================
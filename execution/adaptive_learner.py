@@ -13,6 +13,7 @@ The system tracks pattern-based adjustments that are applied
 during credibility scoring to improve accuracy over time.
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -22,16 +23,145 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "api"))
 from typing import Dict, List, Tuple
 import re
 import json
+from collections import defaultdict
+
+import numpy as np
+
+# Try importing orjson (optional, faster weights backup encoding)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try importing pyahocorasick (optional, one pass for all keyword groups)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Try importing numba (optional, JIT-compiles the weight kernel)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Import Supabase weight functions
 try:
-    from feedback_db import update_weight_adjustment, get_all_weight_adjustments, SUPABASE_AVAILABLE
+    from feedback_db import update_weight_adjustments_batch, get_all_weight_adjustments, SUPABASE_AVAILABLE
 except ImportError:
     SUPABASE_AVAILABLE = False
-    update_weight_adjustment = None
+    update_weight_adjustments_batch = None
     get_all_weight_adjustments = None
 
 
+# ============================================
+# Feature Patterns
+# ============================================
+
+# Keyword features: 1.0 if any phrase occurs as a substring of the lowered text
+KEYWORD_FEATURES = {
+    "extreme_positive": ["perfect", "amazing", "best ever", "love it"],
+    "extreme_negative": ["worst", "terrible", "awful", "never buy"],
+    "moderate_language": ["decent", "okay", "fine", "not bad"],
+    "generic_praise": ["great product", "highly recommend", "five stars"],
+    "personal_experience": ["i ", "my ", "me ", "we "],
+}
+
+CAPS_WORD_RE = re.compile(r'\b[A-Z]{3,}\b')
+DIGIT_RE = re.compile(r'\d')
+PRODUCT_RE = re.compile(r'product|item|purchase|order')
+SPECIFICS_RE = re.compile(r'\d+(?:\s*(?:days?|weeks?|months?|years?|%|dollars?|\$))')
+
+
+# Fixed feature layout: weights for the three credibility classes live in a
+# (len(CLASS_NAMES), N_FEATURES) array indexed by these positions
+FEATURE_NAMES = (
+    "very_short", "short", "medium", "long",
+    "stars_1", "stars_2", "stars_3", "stars_4", "stars_5",
+    "has_exclamation", "excessive_exclamation", "all_caps_words", "has_numbers",
+    "extreme_positive", "extreme_negative", "moderate_language",
+    "repetitive", "generic_praise", "product_mention",
+    "has_specifics", "personal_experience",
+)
+FEATURE_IDX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+N_FEATURES = len(FEATURE_NAMES)
+STAR_SLOTS = range(FEATURE_IDX["stars_1"], FEATURE_IDX["stars_5"] + 1)
+
+# stars_1..stars_5 values for each clamped rating, indexed by stars - 1
+STAR_ONE_HOT = tuple(
+    tuple(1.0 if slot == stars else 0.0 for slot in range(1, 6))
+    for stars in range(1, 6)
+)
+
+CLASS_NAMES = ("bot", "low_effort", "human")
+CLASS_IDX = {name: i for i, name in enumerate(CLASS_NAMES)}
+
+# Labels for scores below bot / below low_effort / above (ascending thresholds)
+THRESHOLD_CLASSES = np.array(["bot", "low_effort", "human"])
+
+
+# ============================================
+# Weight Kernel
+# ============================================
+
+def _apply_weights(W, x, class_out):
+    """
+    Total learned adjustment for feature vector x; per-class parts go to class_out.
+    
+    Visits (feature, class) pairs in the same order as the original dict
+    loop and skips inactive features. Compiled with numba when available;
+    no fastmath so results stay bit-identical to the Python path.
+    """
+    total = 0.0
+    for c in range(W.shape[0]):
+        class_out[c] = 0.0
+    for j in range(x.shape[0]):
+        if x[j] > 0:
+            for c in range(W.shape[0]):
+                contribution = W[c, j] * x[j]
+                class_out[c] += contribution
+                total += contribution
+    return total
+
+
+if NUMBA_AVAILABLE:
+    _apply_weights = njit(cache=True)(_apply_weights)
+
+
+def warm_kernels() -> None:
+    """Compile (or load the cached) weight kernel before the first request."""
+    _apply_weights(np.zeros((len(CLASS_NAMES), N_FEATURES)), np.zeros(N_FEATURES), np.zeros(len(CLASS_NAMES)))
+
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton mapping each phrase to the features it sets."""
+    phrase_features: Dict[str, list] = {}
+    for feature_name, phrases in KEYWORD_FEATURES.items():
+        for phrase in phrases:
+            phrase_features.setdefault(phrase, []).append(feature_name)
+    
+    automaton = ahocorasick.Automaton()
+    for phrase, feature_names in phrase_features.items():
+        automaton.add_word(phrase, tuple(feature_names))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def _keyword_hits(text_lower: str) -> set:
+    """Names of the KEYWORD_FEATURES present in text_lower (single pass when available)."""
+    if _KEYWORD_AUTOMATON is not None:
+        return {name for _, names in _KEYWORD_AUTOMATON.iter(text_lower) for name in names}
+    return {
+        name for name, phrases in KEYWORD_FEATURES.items()
+        if any(p in text_lower for p in phrases)
+    }
+
+
 class AdaptiveLearner:
     """
     Adaptive learning engine for credibility scoring.
@@ -41,59 +171,115 @@ class AdaptiveLearner:
     """
     
     def __init__(self):
-        # Pattern weights - adjusted through feedback
-        self.pattern_weights: Dict[str, float] = {}
+        # Pattern weights - adjusted through feedback. Keys "{class}:{feature}"
+        # for the three credibility classes are stored in W (seen marks keys
+        # that have been set); any other key lives in _other_weights.
+        self.W = np.zeros((len(CLASS_NAMES), N_FEATURES), dtype=np.float64)
+        self._seen = np.zeros((len(CLASS_NAMES), N_FEATURES), dtype=bool)
+        self._other_weights: Dict[str, float] = defaultdict(float)
         self.class_thresholds = {
             "bot": 0.3,        # Below this = bot
             "low_effort": 0.6  # Below this = low_effort, above = human
         }
         self.learning_rate = 0.05
         self.min_samples_for_adjustment = 3
-        
-    def extract_features(self, text: str, stars: int) -> Dict[str, float]:
+    
+    @property
+    def pattern_weights(self) -> Dict[str, float]:
         """
-        Extract features from review text for pattern matching.
-        Returns normalized feature values.
+        Learned weights as a {"{class}:{feature}": weight} dict (a copy).
+        
+        Both arrays are snapshotted once up front, so keys and values stay
+        paired when another thread updates the learner meanwhile.
         """
+        seen = self._seen.copy()
+        W = self.W.copy()
+        weights = {
+            f"{CLASS_NAMES[c]}:{FEATURE_NAMES[j]}": w
+            for c, j, w in zip(*np.nonzero(seen), W[seen].tolist())
+        }
+        weights.update(self._other_weights)
+        return weights
+    
+    @pattern_weights.setter
+    def pattern_weights(self, weights: Dict[str, float]) -> None:
+        self.W[:] = 0.0
+        self._seen[:] = False
+        self._other_weights = defaultdict(float)
+        for key, value in weights.items():
+            cls, _, feature_name = key.partition(":")
+            c = CLASS_IDX.get(cls)
+            j = FEATURE_IDX.get(feature_name)
+            if c is None or j is None:
+                self._other_weights[key] = value
+            else:
+                self.W[c, j] = value
+                self._seen[c, j] = True
+    
+    def _feature_values(self, text: str, stars: int) -> list:
+        """Feature values in FEATURE_NAMES order."""
+        stars = max(1, min(5, int(stars)))
         text_lower = text.lower()
-        word_count = len(text.split())
+        # lower() never creates or removes whitespace, so one split of the
+        # lowered text serves both the word count and the repetition check
+        words = text_lower.split()
+        word_count = len(words)
+        exclamations = text.count("!")
+        keywords = _keyword_hits(text_lower)
         
-        features = {
+        return [
             # Length features
-            "very_short": 1.0 if word_count < 10 else 0.0,
-            "short": 1.0 if 10 <= word_count < 30 else 0.0,
-            "medium": 1.0 if 30 <= word_count < 100 else 0.0,
-            "long": 1.0 if word_count >= 100 else 0.0,
+            1.0 if word_count < 10 else 0.0,
+            1.0 if 10 <= word_count < 30 else 0.0,
+            1.0 if 30 <= word_count < 100 else 0.0,
+            1.0 if word_count >= 100 else 0.0,
             
-            # Star features
-            f"stars_{stars}": 1.0,
+            # Star features (one-hot)
+            *STAR_ONE_HOT[stars - 1],
             
             # Content patterns
-            "has_exclamation": 1.0 if "!" in text else 0.0,
-            "excessive_exclamation": 1.0 if text.count("!") > 3 else 0.0,
-            "all_caps_words": len(re.findall(r'\b[A-Z]{3,}\b', text)) / max(word_count, 1),
-            "has_numbers": 1.0 if re.search(r'\d', text) else 0.0,
+            1.0 if exclamations else 0.0,
+            1.0 if exclamations > 3 else 0.0,
+            len(CAPS_WORD_RE.findall(text)) / max(word_count, 1),
+            1.0 if DIGIT_RE.search(text) else 0.0,
             
             # Sentiment indicators
-            "extreme_positive": 1.0 if any(w in text_lower for w in ["perfect", "amazing", "best ever", "love it"]) else 0.0,
-            "extreme_negative": 1.0 if any(w in text_lower for w in ["worst", "terrible", "awful", "never buy"]) else 0.0,
-            "moderate_language": 1.0 if any(w in text_lower for w in ["decent", "okay", "fine", "not bad"]) else 0.0,
+            1.0 if "extreme_positive" in keywords else 0.0,
+            1.0 if "extreme_negative" in keywords else 0.0,
+            1.0 if "moderate_language" in keywords else 0.0,
             
             # Suspicious patterns
-            "repetitive": 1.0 if self._is_repetitive(text) else 0.0,
-            "generic_praise": 1.0 if any(w in text_lower for w in ["great product", "highly recommend", "five stars"]) else 0.0,
-            "product_mention": 1.0 if re.search(r'product|item|purchase|order', text_lower) else 0.0,
+            1.0 if self._is_repetitive(text, words) else 0.0,
+            1.0 if "generic_praise" in keywords else 0.0,
+            1.0 if PRODUCT_RE.search(text_lower) else 0.0,
             
             # Quality indicators
-            "has_specifics": 1.0 if re.search(r'\d+(?:\s*(?:days?|weeks?|months?|years?|%|dollars?|\$))', text_lower) else 0.0,
-            "personal_experience": 1.0 if any(w in text_lower for w in ["i ", "my ", "me ", "we "]) else 0.0,
-        }
+            1.0 if SPECIFICS_RE.search(text_lower) else 0.0,
+            1.0 if "personal_experience" in keywords else 0.0,
+        ]
+    
+    def extract_features_vec(self, text: str, stars: int) -> np.ndarray:
+        """Feature vector (float64, FEATURE_NAMES order) for array math."""
+        return np.array(self._feature_values(text, stars), dtype=np.float64)
+    
+    def extract_features(self, text: str, stars: int) -> Dict[str, float]:
+        """
+        Extract features from review text for pattern matching.
+        Returns normalized feature values.
         
-        return features
+        Only the review's own stars_{n} key is included. Stars are clamped
+        to 1-5.
+        """
+        values = self._feature_values(text, stars)
+        return {
+            name: value for j, (name, value) in enumerate(zip(FEATURE_NAMES, values))
+            if value or j not in STAR_SLOTS
+        }
     
-    def _is_repetitive(self, text: str) -> bool:
-        """Check if text has repetitive patterns."""
-        words = text.lower().split()
+    def _is_repetitive(self, text: str, words: List[str] = None) -> bool:
+        """Check if text has repetitive patterns (words: text.lower().split(), if already done)."""
+        if words is None:
+            words = text.lower().split()
         if len(words) < 4:
             return False
         word_set = set(words)
@@ -104,15 +290,18 @@ class AdaptiveLearner:
         text: str,
         stars: int,
         predicted_class: str,
-        user_vote: int  # 1 = agree, -1 = disagree
+        user_vote: int,  # 1 = agree, -1 = disagree
+        persist: bool = True
     ) -> Dict[str, float]:
         """
         Update pattern weights based on user feedback.
         
+        With persist=False the caller is responsible for writing the returned
+        deltas to Supabase (the API batches them across requests).
+        
         Returns the adjustments made.
         """
-        features = self.extract_features(text, stars)
-        adjustments = {}
+        x = self.extract_features_vec(text, stars)
         
         # Calculate update magnitude based on vote
         if user_vote == -1:  # User disagrees
@@ -122,21 +311,28 @@ class AdaptiveLearner:
             # Slightly reinforce (smaller magnitude to prevent overfitting)
             magnitude = self.learning_rate * 0.3
         
-        # Create feature key based on prediction
-        for feature_name, feature_value in features.items():
-            if feature_value > 0:
-                key = f"{predicted_class}:{feature_name}"
-                
-                current = self.pattern_weights.get(key, 0.0)
-                update = magnitude * feature_value
-                new_value = max(-0.5, min(0.5, current + update))  # Clamp
-                
-                self.pattern_weights[key] = new_value
-                adjustments[key] = update
-                
-                # Persist to Supabase immediately
-                if SUPABASE_AVAILABLE and update_weight_adjustment:
-                    update_weight_adjustment(key, update)
+        active = np.flatnonzero(x > 0)
+        updates = magnitude * x[active]
+        keys = [f"{predicted_class}:{FEATURE_NAMES[j]}" for j in active.tolist()]
+        
+        c = CLASS_IDX.get(predicted_class)
+        if c is not None:
+            # Clamp to [-0.5, 0.5] (minimum/maximum: np.clip is slow on tiny arrays)
+            self.W[c, active] = np.minimum(np.maximum(self.W[c, active] + updates, -0.5), 0.5)
+            self._seen[c, active] = True
+        else:
+            # Free-form class labels are kept outside the array
+            for key, update in zip(keys, updates.tolist()):
+                other = self._other_weights
+                other[key] = max(-0.5, min(0.5, other[key] + update))
+        
+        adjustments = dict(zip(keys, updates.tolist()))
+        
+        # Persist to Supabase immediately (one read + one upsert for all keys)
+        if persist and SUPABASE_AVAILABLE and update_weight_adjustments_batch and adjustments:
+            result = update_weight_adjustments_batch(list(adjustments.items()))
+            if not result.get("success"):
+                print(f"Error updating weights: {result.get('error')}")
         
         return adjustments
     
@@ -144,39 +340,62 @@ class AdaptiveLearner:
         self,
         text: str,
         stars: int,
-        base_score: float
+        base_score: float,
+        breakdown: bool = True
     ) -> Tuple[float, Dict]:
         """
         Get credibility score adjustment based on learned patterns.
         
+        Args:
+            breakdown: Include per-pattern applied_weights in debug_info;
+                pass False on hot paths that only need the score
+        
         Returns:
             Tuple of (adjusted_score, debug_info)
         """
-        features = self.extract_features(text, stars)
-        
-        total_adjustment = 0.0
-        applied_weights = {}
+        x = self.extract_features_vec(text, stars)
         
-        for feature_name, feature_value in features.items():
-            if feature_value > 0:
-                # Check all class patterns
-                for cls in ["bot", "low_effort", "human"]:
-                    key = f"{cls}:{feature_name}"
-                    if key in self.pattern_weights:
-                        weight = self.pattern_weights[key]
-                        contribution = weight * feature_value
-                        total_adjustment += contribution
-                        applied_weights[key] = contribution
+        class_contributions = np.empty(len(CLASS_NAMES))
+        total_adjustment = float(_apply_weights(self.W, x, class_contributions))
         
         # Apply adjustment (clamped)
         adjusted_score = max(0.0, min(1.0, base_score + total_adjustment))
         
-        return adjusted_score, {
+        debug = {
             "base_score": base_score,
             "total_adjustment": total_adjustment,
             "adjusted_score": adjusted_score,
-            "applied_weights": applied_weights
+            "class_contributions": dict(zip(CLASS_NAMES, class_contributions.tolist()))
         }
+        
+        if breakdown:
+            # Feature-major, like the keys were originally visited
+            js, cs = np.nonzero((self._seen & (x > 0)).T)
+            contributions = (self.W[cs, js] * x[js]).tolist()
+            debug["applied_weights"] = {
+                f"{CLASS_NAMES[c]}:{FEATURE_NAMES[j]}": contribution
+                for c, j, contribution in zip(cs.tolist(), js.tolist(), contributions)
+            }
+        
+        return adjusted_score, debug
+    
+    def get_adjustment_factor_batch(self, texts: List[str], stars, base_scores) -> np.ndarray:
+        """
+        Vectorized get_adjustment_factor() scores for many reviews.
+        
+        Stacks the feature vectors into an (N, N_FEATURES) matrix and applies
+        every learned weight with one matmul. Totals can differ from the
+        per-review kernel in the last bit (summation order).
+        
+        Returns:
+            NumPy array of adjusted scores, clamped to 0-1
+        """
+        if not len(texts):
+            return np.zeros(0)
+        
+        X = np.array([self._feature_values(t, s) for t, s in zip(texts, stars)], dtype=np.float64)
+        adjustments = X @ self.W.sum(axis=0)
+        return np.clip(np.asarray(base_scores, dtype=np.float64) + adjustments, 0.0, 1.0)
     
     def get_class_from_score(self, score: float) -> str:
         """Convert credibility score to class label."""
@@ -187,6 +406,20 @@ class AdaptiveLearner:
         else:
             return "human"
     
+    def get_classes_from_scores(self, scores) -> np.ndarray:
+        """
+        Vectorized get_class_from_score() over an array of scores.
+        
+        Thresholds are read on every call so edits to class_thresholds
+        (including load_weights) always apply.
+        """
+        boundaries = np.array(
+            [self.class_thresholds["bot"], self.class_thresholds["low_effort"]],
+            dtype=np.float64
+        )
+        # side="right": a score equal to a threshold belongs to the class above
+        return THRESHOLD_CLASSES[np.searchsorted(boundaries, np.asarray(scores, dtype=np.float64), side="right")]
+    
     def save_weights(self, filepath: str = None) -> None:
         """
         Save learned weights.
@@ -195,19 +428,31 @@ class AdaptiveLearner:
         """
         if filepath is None:
             filepath = Path(__file__).parent.parent / "api" / "learned_weights.json"
+        filepath = Path(filepath)
         
         data = {
+            # pattern_weights builds a fresh dict from one snapshot of the
+            # arrays, so saving from a worker thread is safe while requests
+            # keep updating
             "pattern_weights": self.pattern_weights,
             "class_thresholds": self.class_thresholds,
             "learning_rate": self.learning_rate,
             "source": "local_backup"
         }
         
+        # Write a temp file and rename it over the old one, so a crash or a
+        # concurrent reader never sees a half-written backup
+        tmp_path = filepath.with_name(f"{filepath.name}.{os.getpid()}.tmp")
         try:
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=2)
+            if ORJSON_AVAILABLE:
+                tmp_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+            os.replace(tmp_path, filepath)
         except Exception as e:
             print(f"Warning: Could not save local backup: {e}")
+            tmp_path.unlink(missing_ok=True)
     
     def load_weights(self, filepath: str = None) -> bool:
         """
@@ -246,17 +491,18 @@ class AdaptiveLearner:
     
     def get_stats(self) -> Dict:
         """Get learner statistics."""
+        weights = self.pattern_weights
         return {
-            "total_patterns": len(self.pattern_weights),
+            "total_patterns": len(weights),
             "thresholds": self.class_thresholds,
             "learning_rate": self.learning_rate,
             "top_positive_weights": dict(sorted(
-                self.pattern_weights.items(),
+                weights.items(),
                 key=lambda x: x[1],
                 reverse=True
             )[:5]),
             "top_negative_weights": dict(sorted(
-                self.pattern_weights.items(),
+                weights.items(),
                 key=lambda x: x[1]
             )[:5])
         }
@@ -16,8 +16,14 @@ Cost: $0 (all local processing)
 
 import os
 import sys
+import importlib.util
+import queue
+import threading
+from concurrent.futures import Future
 from typing import Optional
 
+from progress import ProgressPrinter
+
 # Try importing VADER
 try:
     from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
@@ -26,12 +32,72 @@ except ImportError:
     VADER_AVAILABLE = False
     print("Warning: vaderSentiment not installed. Run: pip install vaderSentiment")
 
-# Try importing transformers (optional, for higher accuracy)
-try:
-    from transformers import pipeline
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+# Check for transformers (optional, for higher accuracy).
+# Only probe here - importing it pulls in torch and takes seconds, so the
+# actual import happens on first transformer use.
+TRANSFORMERS_AVAILABLE = importlib.util.find_spec("transformers") is not None
+
+# Dynamic int8 quantization of the transformer's Linear layers (CPU only).
+# Off by default so the full-precision model stays the reference path.
+SENTIMENT_INT8 = os.environ.get("SENTIMENT_INT8", "0") == "1"
+
+# Run the fine-tuned model through ONNX Runtime instead of torch (exported
+# once next to the checkpoint; int8-quantized there when SENTIMENT_INT8=1)
+SENTIMENT_ONNX = os.environ.get("SENTIMENT_ONNX", "0") == "1"
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec("onnxruntime") is not None
+
+# Cast the fine-tuned torch model's weights to bfloat16 (CPUs with AVX-512
+# BF16/AMX run it natively; older ones emulate it and get slower). Ignored
+# together with SENTIMENT_INT8, which already replaces the Linear weights.
+SENTIMENT_BF16 = os.environ.get("SENTIMENT_BF16", "0") == "1"
+
+# Trace and freeze the fine-tuned torch model with TorchScript after loading
+SENTIMENT_JIT = os.environ.get("SENTIMENT_JIT", "0") == "1"
+
+
+# One VADER analyzer per process. Building it parses the lexicon and emoji
+# files; polarity_scores only reads them, so instances and threads share it.
+_shared_vader = None
+_shared_vader_lock = threading.Lock()
+
+
+def _get_shared_vader():
+    """The process-wide SentimentIntensityAnalyzer (None without vaderSentiment)."""
+    global _shared_vader
+    if _shared_vader is None and VADER_AVAILABLE:
+        with _shared_vader_lock:
+            if _shared_vader is None:
+                _shared_vader = SentimentIntensityAnalyzer()
+    return _shared_vader
+
+
+def _quantize_int8(model):
+    """Return an int8 dynamically-quantized copy of model, or model on failure."""
+    try:
+        import torch
+        quantized = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        quantized.eval()
+        return quantized
+    except Exception as e:
+        print(f"Warning: int8 quantization failed, using full precision: {e}")
+        return model
+
+
+def _trace_torchscript(model, tokenizer):
+    """Return a traced, frozen TorchScript copy of model, or model on failure."""
+    try:
+        import torch
+        example = tokenizer("warm up", return_tensors="pt")
+        with torch.no_grad():
+            traced = torch.jit.trace(
+                model, (example["input_ids"], example["attention_mask"]), strict=False
+            )
+            return torch.jit.freeze(traced.eval())
+    except Exception as e:
+        print(f"Warning: TorchScript trace failed, using eager model: {e}")
+        return model
 
 
 class SentimentAnalyzer:
@@ -48,7 +114,9 @@ class SentimentAnalyzer:
                  mode: str = "hybrid",
                  confidence_threshold: float = 0.6,
                  transformer_model: str = "distilbert-base-uncased-finetuned-sst-2-english",
-                 use_finetuned: bool = True):
+                 use_finetuned: bool = True,
+                 batch_size: int = 32,
+                 coalesce: bool = False):
         """
         Initialize the sentiment analyzer.
         
@@ -56,11 +124,16 @@ class SentimentAnalyzer:
             mode: "vader", "transformer", or "hybrid" (default)
             confidence_threshold: VADER confidence below this triggers transformer (0.0-1.0)
             transformer_model: HuggingFace model name for transformer mode
+            batch_size: Texts per forward pass in analyze_transformer_batch
+            coalesce: Merge concurrent analyze() escalations from different
+                threads into shared transformer batches (for the API)
         """
         self.mode = mode
         self.confidence_threshold = confidence_threshold
         self.transformer_model = transformer_model
         self.use_finetuned = use_finetuned
+        self.batch_size = max(1, batch_size)
+        self.coalesce = coalesce
         
         # Check for fine-tuned local model
         self.finetuned_path = os.path.join(
@@ -69,42 +142,177 @@ class SentimentAnalyzer:
         )
         self.has_finetuned = os.path.exists(os.path.join(self.finetuned_path, "model.safetensors"))
         
-        # Initialize VADER
-        if VADER_AVAILABLE:
-            self._vader = SentimentIntensityAnalyzer()
-        else:
-            self._vader = None
+        # Initialize VADER (shared, read-only)
+        self._vader = _get_shared_vader()
         
         # Lazy-load transformer (heavy, only load if needed)
         self._transformer_pipeline = None
         self._finetuned_model = None
+        
+        # Serializes transformer loading and inference so the analyzer can be
+        # shared across worker threads (VADER is stateless and stays unlocked)
+        self._transformer_lock = threading.RLock()
         self._finetuned_tokenizer = None
+        self._ort_session = None
+        
+        # Escalation queue for coalesce=True: (text, Future) pairs drained by
+        # one worker thread, started on first use
+        self._escalations = queue.SimpleQueue()
+        self._coalesce_worker = None
+        self._coalesce_start_lock = threading.Lock()
     
     def _load_transformer(self):
         """Lazy-load transformer model on first use."""
+        with self._transformer_lock:
+            return self._load_transformer_locked()
+    
+    def _load_transformer_locked(self):
+        """Body of _load_transformer (caller holds the transformer lock)."""
+        # Already loaded on a previous call
+        if self._finetuned_model is not None:
+            return "finetuned"
+        
         # Try fine-tuned model first
         if self.use_finetuned and self.has_finetuned and self._finetuned_model is None:
             try:
-                from transformers import DistilBertTokenizer, DistilBertForSequenceClassification
+                from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
                 import torch
                 print(f"Loading fine-tuned model from: {self.finetuned_path}")
-                self._finetuned_tokenizer = DistilBertTokenizer.from_pretrained(self.finetuned_path)
-                self._finetuned_model = DistilBertForSequenceClassification.from_pretrained(self.finetuned_path)
+                # Rust-backed tokenizer: batch calls encode without holding the GIL
+                self._finetuned_tokenizer = DistilBertTokenizerFast.from_pretrained(self.finetuned_path)
+                self._finetuned_model = DistilBertForSequenceClassification.from_pretrained(
+                    self.finetuned_path, torchscript=SENTIMENT_JIT
+                )
                 self._finetuned_model.eval()
+                if SENTIMENT_ONNX and ONNXRUNTIME_AVAILABLE:
+                    self._ort_session = self._load_onnx()
+                if SENTIMENT_INT8 and self._ort_session is None:
+                    self._finetuned_model = _quantize_int8(self._finetuned_model)
+                elif SENTIMENT_BF16 and self._ort_session is None:
+                    self._finetuned_model = self._finetuned_model.to(torch.bfloat16)
+                if SENTIMENT_JIT and self._ort_session is None:
+                    self._finetuned_model = _trace_torchscript(self._finetuned_model, self._finetuned_tokenizer)
                 return "finetuned"
             except Exception as e:
                 print(f"Could not load fine-tuned model: {e}")
         
         # Fall back to HuggingFace pipeline
         if self._transformer_pipeline is None and TRANSFORMERS_AVAILABLE:
+            from transformers import pipeline
             print(f"Loading transformer model: {self.transformer_model}...")
             self._transformer_pipeline = pipeline(
                 "sentiment-analysis",
                 model=self.transformer_model,
                 device=-1  # CPU
             )
+            if SENTIMENT_INT8:
+                self._transformer_pipeline.model = _quantize_int8(self._transformer_pipeline.model)
             return "huggingface"
-        return self._transformer_pipeline
+        if self._transformer_pipeline is not None:
+            return "huggingface"
+        return None
+    
+    def _load_onnx(self):
+        """
+        ONNX Runtime session for the fine-tuned model, or None on failure.
+        
+        Exports model.onnx (and model.int8.onnx with SENTIMENT_INT8) into the
+        checkpoint directory on first use; later loads reuse the files.
+        Caller holds the transformer lock.
+        """
+        try:
+            import onnxruntime as ort
+            
+            fp32_path = os.path.join(self.finetuned_path, "model.onnx")
+            if not os.path.exists(fp32_path):
+                self._export_onnx(fp32_path)
+            
+            model_path = fp32_path
+            if SENTIMENT_INT8:
+                model_path = os.path.join(self.finetuned_path, "model.int8.onnx")
+                if not os.path.exists(model_path):
+                    from onnxruntime.quantization import quantize_dynamic, QuantType
+                    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+                    quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+                    os.replace(tmp_path, model_path)
+            
+            sess_options = ort.SessionOptions()
+            sess_options.intra_op_num_threads = os.cpu_count() or 1
+            session = ort.InferenceSession(
+                model_path, sess_options, providers=["CPUExecutionProvider"]
+            )
+            print(f"Loaded ONNX Runtime session: {model_path}")
+            return session
+        except Exception as e:
+            print(f"Warning: ONNX Runtime load failed, using torch: {e}")
+            return None
+    
+    def _export_onnx(self, path: str) -> None:
+        """Export the loaded fine-tuned model to ONNX (dynamic batch and sequence)."""
+        import torch
+        sample = self._finetuned_tokenizer("warm up", return_tensors="pt")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        print(f"Exporting fine-tuned model to ONNX: {path}")
+        torch.onnx.export(
+            self._finetuned_model,
+            (sample["input_ids"], sample["attention_mask"]),
+            tmp_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"}
+            },
+            opset_version=14
+        )
+        os.replace(tmp_path, path)
+    
+    def _finetuned_logits(self, inputs):
+        """
+        Logits from the torch fine-tuned model (eager or TorchScript).
+        
+        Positional inputs and output[0] work for both: a traced module takes
+        no keyword arguments and returns a tuple. Logits come back as float32
+        (a no-op unless the model runs in bfloat16) so softmax stays precise.
+        """
+        return self._finetuned_model(inputs["input_ids"], inputs["attention_mask"])[0].float()
+    
+    def _ort_predict(self, texts: list[str]) -> tuple[list, list]:
+        """(predicted labels, confidences) for texts via the ONNX Runtime session."""
+        inputs = self._finetuned_tokenizer(
+            texts,
+            truncation=True,
+            padding=True,
+            max_length=128,
+            return_tensors="np"
+        )
+        return self._ort_run(inputs)
+    
+    def _ort_run(self, inputs) -> tuple[list, list]:
+        """(predicted labels, confidences) for padded numpy tokenizer output."""
+        import numpy as np
+        # On CPU, ORT reads contiguous int64 numpy inputs in place, so only
+        # convert (and copy) when the tokenizer returned something else
+        feed = {
+            "input_ids": np.ascontiguousarray(inputs["input_ids"], dtype=np.int64),
+            "attention_mask": np.ascontiguousarray(inputs["attention_mask"], dtype=np.int64)
+        }
+        with self._transformer_lock:
+            logits = self._ort_session.run(None, feed)[0]
+        
+        # Softmax over the label axis
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs = exp / exp.sum(axis=1, keepdims=True)
+        predicted = probs.argmax(axis=1)
+        confidences = probs[np.arange(len(predicted)), predicted]
+        return predicted.tolist(), confidences.tolist()
+    
+    def warm_up(self) -> Optional[str]:
+        """Load the transformer now instead of on the first low-confidence review."""
+        if self.mode == "vader" or not TRANSFORMERS_AVAILABLE:
+            return None
+        return self._load_transformer()
     
     def analyze_vader(self, text: str) -> dict:
         """
@@ -150,6 +358,10 @@ class SentimentAnalyzer:
         # Use fine-tuned model if available
         if model_type == "finetuned" and self._finetuned_model is not None:
             try:
+                if self._ort_session is not None:
+                    predicted, confidences = self._ort_predict([text])
+                    return self._finetuned_result(predicted[0], confidences[0])
+                
                 import torch
                 inputs = self._finetuned_tokenizer(
                     text, 
@@ -159,29 +371,13 @@ class SentimentAnalyzer:
                     return_tensors="pt"
                 )
                 
-                with torch.no_grad():
-                    outputs = self._finetuned_model(**inputs)
-                    probs = torch.softmax(outputs.logits, dim=1)[0]
+                with self._transformer_lock, torch.no_grad():
+                    logits = self._finetuned_logits(inputs)
+                    probs = torch.softmax(logits, dim=1)[0]
                     predicted = torch.argmax(probs).item()
                     confidence = probs[predicted].item()
                 
-                # Label map: 0=negative, 1=neutral, 2=positive
-                if predicted == 0:  # Negative
-                    score = -confidence
-                    label = "NEGATIVE"
-                elif predicted == 2:  # Positive
-                    score = confidence
-                    label = "POSITIVE"
-                else:  # Neutral
-                    score = 0.0
-                    label = "NEUTRAL"
-                
-                return {
-                    "sentiment_score": round(score, 4),
-                    "confidence": round(confidence, 4),
-                    "label": label,
-                    "model_used": "finetuned"
-                }
+                return self._finetuned_result(predicted, confidence)
             except Exception as e:
                 return {"sentiment_score": 0.0, "confidence": 0.0, "error": str(e)}
         
@@ -190,34 +386,176 @@ class SentimentAnalyzer:
             return {"sentiment_score": 0.0, "confidence": 0.0, "error": "Transformers not available"}
         
         try:
-            result = self._transformer_pipeline(text)[0]
-            
-            # Convert label to -1/+1 score
-            if result["label"] == "POSITIVE":
-                score = result["score"]
-            else:  # NEGATIVE
-                score = -result["score"]
-            
-            return {
-                "sentiment_score": round(score, 4),
-                "confidence": round(result["score"], 4),
-                "label": result["label"],
-                "model_used": "transformer"
-            }
+            with self._transformer_lock:
+                prediction = self._transformer_pipeline(text)[0]
+            return self._pipeline_result(prediction)
         except Exception as e:
             return {"sentiment_score": 0.0, "confidence": 0.0, "error": str(e)}
     
-    def analyze(self, text: str) -> dict:
+    def analyze_transformer_batch(self, texts: list[str]) -> list[dict]:
+        """
+        Analyze many texts with batched transformer calls.
+        
+        Texts are sorted by length (token count for the fine-tuned model,
+        characters for the pipeline) and run in padded mini-batches of
+        batch_size, so per-call model overhead is paid once per mini-batch
+        and short reviews aren't padded out to the longest one.
+        
+        Returns:
+            List of results in the same shape as analyze_transformer()
+        """
+        model_type = self._load_transformer()
+        results = [{"sentiment_score": 0.0, "confidence": 0.0} for _ in texts]
+        
+        # Only non-trivial texts go to the model, shortest first
+        indices = [i for i, t in enumerate(texts) if t and len(t.strip()) >= 2]
+        if not indices:
+            return results
+        indices.sort(key=lambda i: len(texts[i]))
+        batch = [texts[i][:2000] for i in indices]
+        
+        if model_type == "finetuned" and self._finetuned_model is not None:
+            # Tokenize everything once (unpadded), then bucket by exact token
+            # count and pad each mini-batch only to its own longest row
+            try:
+                encodings = self._finetuned_tokenizer(batch, truncation=True, max_length=128)
+            except Exception as e:
+                for i in indices:
+                    results[i] = {"sentiment_score": 0.0, "confidence": 0.0, "error": str(e)}
+                return results
+            input_ids = encodings["input_ids"]
+            attention_mask = encodings["attention_mask"]
+            order = sorted(range(len(batch)), key=lambda k: len(input_ids[k]))
+            
+            for start in range(0, len(order), self.batch_size):
+                chunk = order[start:start + self.batch_size]
+                rows = [{"input_ids": input_ids[k], "attention_mask": attention_mask[k]} for k in chunk]
+                try:
+                    if self._ort_session is not None:
+                        predicted, confidences = self._ort_run(
+                            self._finetuned_tokenizer.pad(rows, return_tensors="np")
+                        )
+                    else:
+                        import torch
+                        inputs = self._finetuned_tokenizer.pad(rows, return_tensors="pt")
+                        
+                        with self._transformer_lock, torch.no_grad():
+                            logits = self._finetuned_logits(inputs)
+                            probs = torch.softmax(logits, dim=1)
+                            predicted = probs.argmax(dim=1)
+                            confidences = probs.gather(1, predicted.unsqueeze(1)).squeeze(1)
+                        predicted, confidences = predicted.tolist(), confidences.tolist()
+                    
+                    for k, pred, conf in zip(chunk, predicted, confidences):
+                        results[indices[k]] = self._finetuned_result(pred, conf)
+                except Exception as e:
+                    for k in chunk:
+                        results[indices[k]] = {"sentiment_score": 0.0, "confidence": 0.0, "error": str(e)}
+            return results
+        
+        # Fall back to HuggingFace pipeline (accepts a list natively)
+        if not self._transformer_pipeline:
+            for i in indices:
+                results[i] = {"sentiment_score": 0.0, "confidence": 0.0, "error": "Transformers not available"}
+            return results
+        
+        try:
+            with self._transformer_lock:
+                predictions = self._transformer_pipeline(batch, batch_size=self.batch_size)
+            for i, result in zip(indices, predictions):
+                results[i] = self._pipeline_result(result)
+        except Exception as e:
+            for i in indices:
+                results[i] = {"sentiment_score": 0.0, "confidence": 0.0, "error": str(e)}
+        return results
+    
+    def _transformer_one(self, text: str) -> dict:
+        """analyze_transformer(text), via the shared escalation batches if coalescing."""
+        if not self.coalesce:
+            return self.analyze_transformer(text)
+        
+        with self._coalesce_start_lock:
+            if self._coalesce_worker is None:
+                self._coalesce_worker = threading.Thread(
+                    target=self._coalesce_loop, name="sentiment-coalesce", daemon=True
+                )
+                self._coalesce_worker.start()
+        
+        future = Future()
+        self._escalations.put((text, future))
+        return future.result()
+    
+    def _coalesce_loop(self):
+        """
+        Run queued escalations through analyze_transformer_batch, forever.
+        
+        No timer: the worker takes whatever is queued (up to batch_size) as
+        soon as the model is free, so a lone request isn't delayed and
+        requests arriving during a forward pass share the next one.
+        """
+        while True:
+            items = [self._escalations.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._escalations.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                results = self.analyze_transformer_batch([text for text, _ in items])
+            except Exception as e:
+                results = [{"sentiment_score": 0.0, "confidence": 0.0, "error": str(e)} for _ in items]
+            for (_, future), result in zip(items, results):
+                future.set_result(result)
+    
+    def _finetuned_result(self, predicted: int, confidence: float) -> dict:
+        """Convert a fine-tuned model prediction to a sentiment result."""
+        # Label map: 0=negative, 1=neutral, 2=positive
+        if predicted == 0:  # Negative
+            score = -confidence
+            label = "NEGATIVE"
+        elif predicted == 2:  # Positive
+            score = confidence
+            label = "POSITIVE"
+        else:  # Neutral
+            score = 0.0
+            label = "NEUTRAL"
+        
+        return {
+            "sentiment_score": round(score, 4),
+            "confidence": round(confidence, 4),
+            "label": label,
+            "model_used": "finetuned"
+        }
+    
+    def _pipeline_result(self, result: dict) -> dict:
+        """Convert a HuggingFace pipeline prediction to a sentiment result."""
+        # Convert label to -1/+1 score
+        if result["label"] == "POSITIVE":
+            score = result["score"]
+        else:  # NEGATIVE
+            score = -result["score"]
+        
+        return {
+            "sentiment_score": round(score, 4),
+            "confidence": round(result["score"], 4),
+            "label": result["label"],
+            "model_used": "transformer"
+        }
+    
+    def analyze(self, text: str, features=None) -> dict:
         """
         Analyze sentiment using configured mode (hybrid by default).
         
         Args:
             text: Review text to analyze
+            features: Precomputed review_features.prepare(text) bundle, optional
             
         Returns:
             dict with sentiment_score (-1 to +1), confidence, model_used
         """
-        if not text or len(text.strip()) < 2:
+        stripped_len = features.n_chars if features is not None else len(text.strip()) if text else 0
+        if stripped_len < 2:
             return {
                 "sentiment_score": 0.0,
                 "confidence": 0.0,
@@ -231,7 +569,7 @@ class SentimentAnalyzer:
         
         # Mode: Transformer only
         if self.mode == "transformer":
-            return self.analyze_transformer(text)
+            return self._transformer_one(text)
         
         # Mode: Hybrid (default)
         # Step 1: Fast VADER analysis
@@ -243,7 +581,7 @@ class SentimentAnalyzer:
         
         # Step 3: Low confidence, try transformer
         if TRANSFORMERS_AVAILABLE:
-            transformer_result = self.analyze_transformer(text)
+            transformer_result = self._transformer_one(text)
             if "error" not in transformer_result:
                 return transformer_result
         
@@ -254,6 +592,10 @@ class SentimentAnalyzer:
         """
         Analyze multiple texts efficiently.
         
+        Same results as calling analyze() per text, but duplicate texts are
+        analyzed once and every text that needs the transformer is sent to it
+        in a single batched call.
+        
         Args:
             texts: List of review texts
             show_progress: Print progress updates
@@ -261,18 +603,58 @@ class SentimentAnalyzer:
         Returns:
             List of sentiment results
         """
-        results = []
+        # Templated/spam reviews repeat verbatim; work on the unique texts and
+        # copy results back out at the end
+        first_index = {}
+        for text in texts:
+            first_index.setdefault(text, len(first_index))
+        all_texts, texts = texts, list(first_index)
+        
         total = len(texts)
+        empty = {
+            "sentiment_score": 0.0,
+            "confidence": 0.0,
+            "model_used": "none",
+            "reason": "empty_or_too_short"
+        }
+        results = []
         
+        # Step 1: Empty texts short-circuit; VADER for everything else
+        progress = ProgressPrinter("Processing", total, enabled=show_progress)
         for i, text in enumerate(texts):
-            if show_progress and i % 100 == 0:
-                print(f"Processing {i}/{total}...")
-            results.append(self.analyze(text))
+            progress.update(i)
+            if not text or len(text.strip()) < 2:
+                results.append(dict(empty))
+            elif self.mode == "transformer":
+                results.append(None)
+            else:
+                results.append(self.analyze_vader(text))
+        
+        # Step 2: Collect the texts that need the transformer
+        if self.mode == "transformer":
+            escalate = [i for i, r in enumerate(results) if r is None]
+        elif self.mode == "hybrid" and TRANSFORMERS_AVAILABLE:
+            escalate = [
+                i for i, r in enumerate(results)
+                if r.get("model_used") != "none" and r.get("confidence", 0) < self.confidence_threshold
+            ]
+        else:
+            escalate = []
+        
+        # Step 3: One batched transformer call for all escalated texts
+        if escalate:
+            transformer_results = self.analyze_transformer_batch([texts[i] for i in escalate])
+            for i, transformer_result in zip(escalate, transformer_results):
+                # Hybrid falls back to VADER if transformer fails
+                if self.mode == "transformer" or "error" not in transformer_result:
+                    results[i] = transformer_result
         
         if show_progress:
             print(f"Completed {total} reviews.")
         
-        return results
+        if len(texts) == len(all_texts):
+            return results
+        return [dict(results[first_index[text]]) for text in all_texts]
 
 
 # ============================================
@@ -16,6 +16,71 @@ Cost: $0 (all local processing)
 
 from typing import Optional
 
+import numpy as np
+
+# Try importing numba (optional, JIT-compiles the batch kernel)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# calculate_vec switches to the multi-threaded kernel from this many rows
+# (offline jobs); smaller batches such as API requests stay single-threaded
+PARALLEL_MIN_ROWS = 100_000
+
+
+# ============================================
+# Batch Kernel
+# ============================================
+
+def _calc_kernel(stars, sent, cred, is_sarc, sarc_conf, star_weight, sentiment_weight, out):
+    """
+    Per-review rating arithmetic over whole arrays (same steps as calculate()).
+    
+    Inputs are already clamped. Compiled with numba when available; no
+    fastmath so results stay bit-identical to the NumPy path. Rows are
+    independent, so the parallel build splits the prange across cores.
+    """
+    for i in prange(stars.size):
+        sentiment_rating = (sent[i] + 1.0) * 2.0 + 1.0
+        if is_sarc[i] and sarc_conf[i] >= 0.5:
+            sentiment_rating = 6 - sentiment_rating
+        
+        rating = (stars[i] * star_weight) + (sentiment_rating * sentiment_weight)
+        
+        if cred[i] < 0.4:
+            neutrality_factor = 1 - (cred[i] / 0.4)
+            rating = rating * (1 - neutrality_factor * 0.5) + 3.0 * (neutrality_factor * 0.5)
+        
+        out[i] = max(1.0, min(5.0, rating))
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """
+    Round to 2 places with Python round(), as calculate() does.
+    
+    np.round differs on ties (binary values just either side of .xx5), so
+    using it alone would let the same review get a different rating from
+    calculate_vec than from calculate_rating. Away from a tie both pick the
+    same hundredth, so only the few values near one go through round().
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100.0
+    near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_tie.tolist():
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+if NUMBA_AVAILABLE:
+    _calc_kernel_parallel = njit(parallel=True, cache=True)(_calc_kernel)
+    # Serial build for the API: it calls this from several executor threads
+    # at once (numba's default threading layer doesn't support concurrent
+    # parallel launches), and batches are at most a few hundred reviews
+    _calc_kernel = njit(cache=True)(_calc_kernel)
+
 
 class WeightedRatingCalculator:
     """
@@ -53,10 +118,12 @@ class WeightedRatingCalculator:
              0.0 → 3.0 (neutral)
             +1.0 → 5.0 (very positive)
         """
-        # Formula: ((sentiment + 1) / 2) * 4 + 1
+        # Formula: ((sentiment + 1) / 2) * 4 + 1, computed as (sentiment + 1) * 2 + 1:
+        # halving and scaling by 4 are exact in binary, so the two are
+        # bit-identical and this skips the division
         # Clamp sentiment to valid range first
         sentiment_clamped = max(-1.0, min(1.0, sentiment_score))
-        return ((sentiment_clamped + 1) / 2) * 4 + 1
+        return (sentiment_clamped + 1.0) * 2.0 + 1.0
     
     def calculate(self,
                   stars: int,
@@ -83,23 +150,74 @@ class WeightedRatingCalculator:
         sentiment_score = max(-1.0, min(1.0, sentiment_score))
         credibility = max(0.0, min(1.0, credibility))
         
+        sentiment_rating, effective_sentiment_rating, base_rating, adjusted_rating = self._rating_steps(
+            stars, sentiment_score, credibility, is_sarcastic, sarcasm_confidence
+        )
+        
+        return {
+            "adjusted_rating": round(adjusted_rating, 2),
+            "components": {
+                "original_stars": stars,
+                "sentiment_score": sentiment_score,
+                "sentiment_as_rating": round(sentiment_rating, 2),
+                "sarcasm_detected": is_sarcastic,
+                "sarcasm_confidence": sarcasm_confidence,
+                "effective_sentiment_rating": round(effective_sentiment_rating, 2),
+                "credibility": credibility,
+                "star_weight": self.star_weight,
+                "sentiment_weight": self.sentiment_weight,
+                "base_rating_before_cred": round(base_rating, 2)
+            }
+        }
+    
+    def calculate_rating(self,
+                         stars: int,
+                         sentiment_score: float,
+                         credibility: float = 1.0,
+                         is_sarcastic: bool = False,
+                         sarcasm_confidence: float = 0.0) -> float:
+        """
+        calculate()["adjusted_rating"] without building the components dict.
+        
+        For row-at-a-time callers that only need the rating.
+        """
+        stars = max(1, min(5, stars))
+        sentiment_score = max(-1.0, min(1.0, sentiment_score))
+        credibility = max(0.0, min(1.0, credibility))
+        
+        adjusted_rating = self._rating_steps(
+            stars, sentiment_score, credibility, is_sarcastic, sarcasm_confidence
+        )[3]
+        return round(adjusted_rating, 2)
+    
+    def _rating_steps(self,
+                      stars: int,
+                      sentiment_score: float,
+                      credibility: float,
+                      is_sarcastic: bool,
+                      sarcasm_confidence: float) -> tuple:
+        """
+        calculate() steps 1-5 on already-clamped inputs, unrounded.
+        
+        Returns:
+            (sentiment_rating, effective_sentiment_rating, base_rating, adjusted_rating)
+        """
         # ============================================
         # Step 1: Convert sentiment to rating scale
         # ============================================
         
-        sentiment_rating = self.sentiment_to_rating(sentiment_score)
+        # Input is clamped, so this is sentiment_to_rating() minus the clamp
+        sentiment_rating = (sentiment_score + 1.0) * 2.0 + 1.0
         
         # ============================================
         # Step 2: Handle sarcasm (invert sentiment)
         # ============================================
         
         effective_sentiment_rating = sentiment_rating
-        sarcasm_adjustment = 0.0
         
         if is_sarcastic and sarcasm_confidence >= 0.5:
             # Invert sentiment: 5 → 1, 4 → 2, 3 → 3, 2 → 4, 1 → 5
             effective_sentiment_rating = 6 - sentiment_rating
-            sarcasm_adjustment = effective_sentiment_rating - sentiment_rating
         
         # ============================================
         # Step 3: Apply 20/80 weighted fusion
@@ -125,21 +243,7 @@ class WeightedRatingCalculator:
         
         adjusted_rating = max(1.0, min(5.0, adjusted_rating))
         
-        return {
-            "adjusted_rating": round(adjusted_rating, 2),
-            "components": {
-                "original_stars": stars,
-                "sentiment_score": sentiment_score,
-                "sentiment_as_rating": round(sentiment_rating, 2),
-                "sarcasm_detected": is_sarcastic,
-                "sarcasm_confidence": sarcasm_confidence,
-                "effective_sentiment_rating": round(effective_sentiment_rating, 2),
-                "credibility": credibility,
-                "star_weight": self.star_weight,
-                "sentiment_weight": self.sentiment_weight,
-                "base_rating_before_cred": round(base_rating, 2)
-            }
-        }
+        return sentiment_rating, effective_sentiment_rating, base_rating, adjusted_rating
     
     def calculate_simple(self, stars: int, sentiment_score: float) -> float:
         """
@@ -156,6 +260,82 @@ class WeightedRatingCalculator:
         rating = (stars * self.star_weight) + (sentiment_rating * self.sentiment_weight)
         return round(max(1.0, min(5.0, rating)), 2)
     
+    def calculate_vec(self,
+                      stars,
+                      sentiment_scores,
+                      credibility=None,
+                      is_sarcastic=None,
+                      sarcasm_confidence=None) -> np.ndarray:
+        """
+        Vectorized calculate() over arrays of reviews.
+        
+        Applies exactly the same steps as calculate() in a numba-compiled loop
+        (multi-threaded from PARALLEL_MIN_ROWS rows; NumPy arithmetic if
+        numba is missing) and the same Python round(), but returns only the
+        adjusted ratings (no per-review components dict).
+        
+        Args:
+            stars: Array-like of star ratings (1-5)
+            sentiment_scores: Array-like of sentiment scores (-1 to +1)
+            credibility: Array-like of credibility scores (0-1), default 1.0
+            is_sarcastic: Array-like of sarcasm flags, default False
+            sarcasm_confidence: Array-like of sarcasm confidences (0-1), default 0.0
+            
+        Returns:
+            NumPy float64 array of adjusted ratings (1.0-5.0), rounded to 2 places
+        """
+        stars = np.clip(np.asarray(stars, dtype=np.int64), 1, 5)
+        sentiment = np.clip(np.asarray(sentiment_scores, dtype=np.float64), -1.0, 1.0)
+        n = stars.shape[0]
+        
+        if credibility is None:
+            credibility = np.ones(n)
+        if is_sarcastic is None:
+            is_sarcastic = np.zeros(n, dtype=bool)
+        if sarcasm_confidence is None:
+            sarcasm_confidence = np.zeros(n)
+        credibility = np.clip(np.asarray(credibility, dtype=np.float64), 0.0, 1.0)
+        is_sarcastic = np.asarray(is_sarcastic, dtype=bool)
+        sarcasm_confidence = np.asarray(sarcasm_confidence, dtype=np.float64)
+        
+        if NUMBA_AVAILABLE:
+            kernel = _calc_kernel_parallel if n >= PARALLEL_MIN_ROWS else _calc_kernel
+            out = np.empty(n, dtype=np.float64)
+            kernel(stars, sentiment, credibility, is_sarcastic, sarcasm_confidence,
+                   float(self.star_weight), float(self.sentiment_weight), out)
+            return _round2(out)
+        
+        adjusted = self._vec_steps(stars, sentiment, credibility, is_sarcastic, sarcasm_confidence)[3]
+        return _round2(adjusted)
+    
+    def _vec_steps(self, stars, sentiment, credibility, is_sarcastic, sarcasm_confidence) -> tuple:
+        """
+        calculate() steps 1-5 over clamped arrays, unrounded.
+        
+        Returns:
+            (sentiment_rating, effective_sentiment_rating, base_rating, adjusted_rating)
+        """
+        # Step 1: Sentiment → rating scale
+        sentiment_rating = (sentiment + 1.0) * 2.0 + 1.0
+        
+        # Step 2: Invert sentiment for confident sarcasm
+        effective = np.where(is_sarcastic & (sarcasm_confidence >= 0.5), 6 - sentiment_rating, sentiment_rating)
+        
+        # Step 3: 20/80 weighted fusion
+        base_rating = (stars * self.star_weight) + (effective * self.sentiment_weight)
+        
+        # Step 4: Low credibility pushed toward neutral (3.0)
+        low = credibility < 0.4
+        neutrality_factor = np.where(low, 1 - (credibility / 0.4), 0.0)
+        adjusted = np.where(
+            low,
+            base_rating * (1 - neutrality_factor * 0.5) + 3.0 * (neutrality_factor * 0.5),
+            base_rating
+        )
+        
+        # Step 5: Clamp to valid range
+        return sentiment_rating, effective, base_rating, np.clip(adjusted, 1.0, 5.0)
+    
     def calculate_batch(self, reviews: list[dict], show_progress: bool = True) -> list[dict]:
         """
         Calculate weighted ratings for multiple reviews.
@@ -171,21 +351,48 @@ class WeightedRatingCalculator:
         Returns:
             List of calculation results
         """
-        results = []
         total = len(reviews)
+        if show_progress:
+            print(f"Calculating {total} reviews...")
         
-        for i, review in enumerate(reviews):
-            if show_progress and i % 100 == 0:
-                print(f"Calculating {i}/{total}...")
-            
-            result = self.calculate(
-                stars=review.get("stars", 3),
-                sentiment_score=review.get("sentiment_score", 0.0),
-                credibility=review.get("credibility", 1.0),
-                is_sarcastic=review.get("is_sarcastic", False),
-                sarcasm_confidence=review.get("sarcasm_confidence", 0.0)
+        # Clamped inputs as calculate() sees them (Python values, for the components)
+        stars = [max(1, min(5, r.get("stars", 3))) for r in reviews]
+        sentiment = [max(-1.0, min(1.0, r.get("sentiment_score", 0.0))) for r in reviews]
+        credibility = [max(0.0, min(1.0, r.get("credibility", 1.0))) for r in reviews]
+        is_sarcastic = [r.get("is_sarcastic", False) for r in reviews]
+        sarcasm_confidence = [r.get("sarcasm_confidence", 0.0) for r in reviews]
+        
+        # All arithmetic on whole arrays; same operations in the same order
+        # as calculate(), so values match it exactly before rounding
+        sentiment_rating, effective, base_rating, adjusted = (
+            a.tolist() for a in self._vec_steps(
+                np.asarray(stars, dtype=np.float64).reshape(-1),
+                np.asarray(sentiment, dtype=np.float64).reshape(-1),
+                np.asarray(credibility, dtype=np.float64).reshape(-1),
+                np.asarray(is_sarcastic, dtype=bool).reshape(-1),
+                np.asarray(sarcasm_confidence, dtype=np.float64).reshape(-1)
             )
-            results.append(result)
+        )
+        
+        # Python round() per value, as calculate() does (np.round differs on ties)
+        results = [
+            {
+                "adjusted_rating": round(adjusted[i], 2),
+                "components": {
+                    "original_stars": stars[i],
+                    "sentiment_score": sentiment[i],
+                    "sentiment_as_rating": round(sentiment_rating[i], 2),
+                    "sarcasm_detected": is_sarcastic[i],
+                    "sarcasm_confidence": sarcasm_confidence[i],
+                    "effective_sentiment_rating": round(effective[i], 2),
+                    "credibility": credibility[i],
+                    "star_weight": self.star_weight,
+                    "sentiment_weight": self.sentiment_weight,
+                    "base_rating_before_cred": round(base_rating[i], 2)
+                }
+            }
+            for i in range(total)
+        ]
         
         if show_progress:
             print(f"Completed {total} reviews.")
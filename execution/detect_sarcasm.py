@@ -15,8 +15,26 @@ Cost: $0 (all local processing)
 """
 
 import re
+import threading
 from typing import Optional
 
+from review_features import ReviewFeatures, prepare
+from progress import ProgressPrinter
+
+# Try importing hyperscan (optional, matches every phrase list in one pass)
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Try importing pyahocorasick (optional, single-pass fallback without hyperscan)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 
 class SarcasmDetector:
     """
@@ -70,11 +88,87 @@ class SarcasmDetector:
     ]
     
     def __init__(self):
-        pass
+        # One multi-pattern matcher (hyperscan, else Aho-Corasick) over all
+        # three phrase lists; ids are positions in the concatenated list so
+        # results keep list order. No n-gram prefilter in front of it: the
+        # phrases cover 354 distinct trigrams ("great", "sure", "right"...),
+        # so almost every real review passes one and the check costs about
+        # as much as the scan it would skip.
+        self._phrases = self.SARCASM_MARKERS + self.NEGATIVE_CONTEXT + self.POSITIVE_WORDS
+        self._n_markers = len(self.SARCASM_MARKERS)
+        self._n_negatives = len(self.NEGATIVE_CONTEXT)
+        self._hs_db = None
+        self._ac = None
+        self._hs_local = threading.local()  # Scratch space is per thread
+        
+        if HYPERSCAN_AVAILABLE:
+            try:
+                db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                db.compile(
+                    expressions=[re.escape(p).encode("utf-8") for p in self._phrases],
+                    ids=list(range(len(self._phrases))),
+                    elements=len(self._phrases),
+                    flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(self._phrases)
+                )
+                self._hs_db = db
+            except Exception as e:
+                print(f"Warning: hyperscan compile failed, falling back: {e}")
+        
+        if self._hs_db is None and AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for i, phrase in enumerate(self._phrases):
+                # A phrase listed twice keeps its first position
+                if phrase not in automaton:
+                    automaton.add_word(phrase, i)
+            automaton.make_automaton()
+            self._ac = automaton
+    
+    def _find_phrases(self, text_lower: str) -> tuple[list, list, list]:
+        """
+        Find which markers, negative-context and positive phrases occur in text.
+        
+        Plain substring semantics either way ("right" matches in "alright",
+        "broke" in "broke," - so whole-token set lookups can't stand in for
+        the single-word phrases); each list comes back in the order of its
+        class-level definition.
+        """
+        if self._hs_db is not None:
+            scratch = getattr(self._hs_local, "scratch", None)
+            if scratch is None:
+                scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+            
+            hits = set()
+            self._hs_db.scan(
+                text_lower.encode("utf-8"),
+                match_event_handler=lambda id_, start, end, flags, ctx: hits.add(id_),
+                scratch=scratch
+            )
+        elif self._ac is not None:
+            hits = {i for _, i in self._ac.iter(text_lower)}
+        else:
+            # One `in` per phrase runs in C and beats a fused re alternation
+            # here: re backtracks through every alternative at each position
+            # (and needs lookaheads to keep overlapping hits), measured 3-5x
+            # slower on typical reviews
+            return (
+                [m for m in self.SARCASM_MARKERS if m in text_lower],
+                [n for n in self.NEGATIVE_CONTEXT if n in text_lower],
+                [p for p in self.POSITIVE_WORDS if p in text_lower]
+            )
+        
+        ids = sorted(hits)
+        first_pos = self._n_markers + self._n_negatives
+        phrases = self._phrases
+        return (
+            [phrases[i] for i in ids if i < self._n_markers],
+            [phrases[i] for i in ids if self._n_markers <= i < first_pos],
+            [phrases[i] for i in ids if i >= first_pos]
+        )
     
     def detect(self, text: str, 
                stars: Optional[int] = None,
-               sentiment_score: Optional[float] = None) -> dict:
+               sentiment_score: Optional[float] = None,
+               features: Optional[ReviewFeatures] = None) -> dict:
         """
         Detect if a review is sarcastic.
         
@@ -82,16 +176,21 @@ class SarcasmDetector:
             text: Review text
             stars: Star rating (1-5)
             sentiment_score: Sentiment from analyzer (-1 to +1)
+            features: Precomputed prepare(text) bundle, optional
             
         Returns:
             is_sarcastic: Boolean
             confidence: 0.0 to 1.0
             triggers: List of detected sarcasm signals
         """
-        if not text or len(text.strip()) < 5:
+        if features is None:
+            features = prepare(text)
+        
+        if features.n_chars < 5:
             return {"is_sarcastic": False, "confidence": 0.0, "triggers": []}
         
-        text_lower = text.lower()
+        text_lower = features.lowered
+        markers_found, negatives_found, positives_found = self._find_phrases(text_lower)
         triggers = []
         sarcasm_score = 0.0
         
@@ -116,11 +215,6 @@ class SarcasmDetector:
         # Signal 2: Sarcasm Markers Present
         # ============================================
         
-        markers_found = []
-        for marker in self.SARCASM_MARKERS:
-            if marker in text_lower:
-                markers_found.append(marker)
-        
         if markers_found:
             sarcasm_score += 0.25 * min(len(markers_found), 3)  # Cap at 3
             triggers.extend([f"marker:{m}" for m in markers_found[:3]])
@@ -129,11 +223,6 @@ class SarcasmDetector:
         # Signal 3: Negative Context Present
         # ============================================
         
-        negatives_found = []
-        for neg in self.NEGATIVE_CONTEXT:
-            if neg in text_lower:
-                negatives_found.append(neg)
-        
         if negatives_found:
             sarcasm_score += 0.15 * min(len(negatives_found), 4)  # Cap at 4
             triggers.extend([f"negative:{n}" for n in negatives_found[:3]])
@@ -152,7 +241,6 @@ class SarcasmDetector:
         # ============================================
         
         if not markers_found and negatives_found:
-            positives_found = [p for p in self.POSITIVE_WORDS if p in text_lower]
             if positives_found:
                 sarcasm_score += 0.2
                 triggers.append("positive_negative_contrast")
@@ -193,16 +281,20 @@ class SarcasmDetector:
         """
         results = []
         total = len(reviews)
+        seen = {}  # (text, stars, sentiment_score) -> result, for repeated reviews
         
+        progress = ProgressPrinter("Checking sarcasm", total, enabled=show_progress)
         for i, review in enumerate(reviews):
-            if show_progress and i % 100 == 0:
-                print(f"Checking sarcasm {i}/{total}...")
+            progress.update(i)
             
-            result = self.detect(
-                text=review.get("text", ""),
-                stars=review.get("stars"),
-                sentiment_score=review.get("sentiment_score")
-            )
+            key = (review.get("text", ""), review.get("stars"), review.get("sentiment_score"))
+            cached = seen.get(key)
+            if cached is not None:
+                results.append({**cached, "triggers": list(cached["triggers"])})
+                continue
+            
+            result = self.detect(text=key[0], stars=key[1], sentiment_score=key[2])
+            seen[key] = result
             results.append(result)
         
         if show_progress:
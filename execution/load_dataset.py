@@ -15,13 +15,55 @@ Cost: $0 (local processing)
 """
 
 import gzip
+import io
 import json
 import os
 from pathlib import Path
-from collections import defaultdict
 from typing import Optional
 import pickle
 
+import numpy as np
+
+# Try importing pyarrow (optional, enables the memory-mapped review store)
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Try importing rapidgzip (optional, parallel DEFLATE decompression)
+try:
+    import rapidgzip
+    RAPIDGZIP_AVAILABLE = True
+except ImportError:
+    RAPIDGZIP_AVAILABLE = False
+
+# Try importing orjson (optional, faster line parsing straight from bytes;
+# its JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try importing msgpack + zstandard (optional, compact index cache instead of pickle)
+try:
+    import msgpack
+    import zstandard
+    MSGPACK_ZSTD_AVAILABLE = True
+except ImportError:
+    MSGPACK_ZSTD_AVAILABLE = False
+
+# Read-ahead for the stdlib gzip fallback. GzipFile on 3.11 inflates in 8 KiB
+# steps; a 128 KiB buffer on top cuts line-iteration time roughly in half.
+READ_BUFFER_SIZE = 128 * 1024
+
+# In-memory reviews are held as columns (field order = review dict key order);
+# the numeric ones are typed NumPy arrays, the string ones plain lists. The
+# asin column is dictionary-encoded: ids in order of first appearance.
+REVIEW_FIELDS = ("id", "stars", "text", "summary", "verified", "date", "asin")
+NUMERIC_COLUMNS = {"id": np.int64, "stars": np.int8, "verified": np.bool_, "asin": np.uint32}
+
 
 class DatasetLoader:
     """
@@ -30,7 +72,10 @@ class DatasetLoader:
     Features:
         - Lazy loading (only loads when first accessed)
         - Caching (saves processed index for fast reload)
-        - Memory-efficient (streams large files)
+        - Memory-efficient (streams large files, column-wise in memory)
+        - Review store (with pyarrow): an uncompressed Arrow IPC file sorted
+          by ASIN plus a JSON sidecar index; it is memory-mapped, so opening
+          it decodes nothing and a product is a zero-copy row-range slice
     """
     
     def __init__(self, dataset_path: str, cache_dir: str = ".tmp"):
@@ -45,15 +90,179 @@ class DatasetLoader:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         
-        self._product_index = None
-        self._review_data = None
+        self._product_index = None  # CSR arrays over the asin column, see _build_product_index
+        self._review_columns = None  # field -> column, see REVIEW_FIELDS
+        self._asin_names = None  # asin id -> ASIN
+        self._asin_ids = None  # ASIN -> asin id
+        self._store_index = None  # asin -> [row_start, row_count, sample_summary]
+        self._store_table = None  # Memory-mapped store table
         self._loaded = False
         
     @property
     def cache_path(self) -> Path:
         """Path to cached index file."""
+        if MSGPACK_ZSTD_AVAILABLE:
+            return self.cache_dir / f"{self.dataset_path.stem}_index.msgpack.zst"
         return self.cache_dir / f"{self.dataset_path.stem}_index.pkl"
     
+    @property
+    def store_path(self) -> Path:
+        """Path to the Arrow IPC review store."""
+        return self.cache_dir / f"{self.dataset_path.stem}_reviews.arrow"
+    
+    @property
+    def store_index_path(self) -> Path:
+        """Path to the review store's sidecar index."""
+        return self.cache_dir / f"{self.dataset_path.stem}_reviews_index.json"
+    
+    def _iter_reviews(self, max_reviews: Optional[int] = None, show_progress: bool = True):
+        """
+        Stream review rows from the gzipped dataset.
+        
+        Rows are plain tuples in REVIEW_FIELDS order; both consumers split
+        them into columns straight away, so a per-review dict (or slots
+        object, slower still to construct) would only be garbage.
+        """
+        # Lines stay bytes: orjson and json.loads both take UTF-8 input, so
+        # there is no text-layer decode per line
+        if RAPIDGZIP_AVAILABLE:
+            opened = rapidgzip.open(str(self.dataset_path), parallelization=os.cpu_count() or 1)
+        else:
+            opened = io.BufferedReader(gzip.open(self.dataset_path, 'rb'), buffer_size=READ_BUFFER_SIZE)
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+        
+        # Progress is due when i reaches next_report (-1 = never): one int
+        # compare per line instead of a flag test plus a modulo
+        next_report = 0 if show_progress else -1
+        
+        with opened as f:
+            for i, line in enumerate(f):
+                if max_reviews and i >= max_reviews:
+                    break
+                
+                if i == next_report:
+                    print(f"  Loaded {i:,} reviews...")
+                    next_report += 50000
+                
+                try:
+                    review = loads(line)
+                    
+                    # Picking the seven fields is a small slice next to the
+                    # parse itself (an itemgetter fast path measured no
+                    # faster); keeping the whole parsed dict instead would
+                    # hold every unused field of every review in memory
+                    yield (
+                        i,
+                        int(review.get("overall", 3)),
+                        review.get("reviewText", ""),
+                        review.get("summary", ""),
+                        review.get("verified", False),
+                        review.get("reviewTime", ""),
+                        review["asin"]
+                    )
+                    
+                except (json.JSONDecodeError, KeyError) as e:
+                    continue
+    
+    # ============================================
+    # Review Store
+    # ============================================
+    
+    def build_store(self, show_progress: bool = True) -> bool:
+        """
+        One-shot preprocess: write all reviews to the Arrow review store.
+        
+        Rows are stably sorted by ASIN (file order kept within a product) and
+        the sidecar JSON maps each ASIN to its (row_start, row_count) plus a
+        sample summary for search_products. Returns True if written.
+        """
+        if not PYARROW_AVAILABLE:
+            return False
+        
+        if show_progress:
+            print(f"Building review store: {self.store_path}")
+        
+        try:
+            columns = {field: [] for field in REVIEW_FIELDS}
+            appends = [values.append for values in columns.values()]
+            for row in self._iter_reviews(show_progress=show_progress):
+                for append, value in zip(appends, row):
+                    append(value)
+            
+            asins = columns["asin"]
+            order = sorted(range(len(asins)), key=asins.__getitem__)
+            table = pa.table({
+                "id": pa.array(columns["id"], pa.int64()),
+                "stars": pa.array(columns["stars"], pa.int8()),
+                "text": pa.array(columns["text"], pa.string()),
+                "summary": pa.array(columns["summary"], pa.string()),
+                "verified": pa.array([bool(v) for v in columns["verified"]], pa.bool_()),
+                "date": pa.array(columns["date"], pa.string()),
+                "asin": pa.array(asins, pa.string()),
+            }).take(pa.array(order, pa.int64()))
+            
+            # Index keeps first-appearance order so ties in search_products
+            # sort the same way as the in-memory index
+            index = {}
+            for i, asin in enumerate(asins):
+                if asin not in index:
+                    index[asin] = [0, 0, columns["summary"][i][:50]]
+                index[asin][1] += 1
+            row = 0
+            for asin in sorted(index):
+                index[asin][0] = row
+                row += index[asin][1]
+            
+            # Uncompressed IPC, so the mapped pages are the column buffers
+            tmp_store = self.store_path.with_suffix(".arrow.tmp")
+            with pa.OSFile(str(tmp_store), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            tmp_index = self.store_index_path.with_suffix(".json.tmp")
+            with open(tmp_index, 'w') as f:
+                json.dump(index, f)
+            os.replace(tmp_store, self.store_path)
+            os.replace(tmp_index, self.store_index_path)
+            
+            if show_progress:
+                print(f"  Stored {len(order):,} reviews, {len(index):,} products")
+            return True
+        except Exception as e:
+            print(f"Review store build failed: {e}")
+            return False
+    
+    def _load_store(self) -> bool:
+        """Memory-map the review store if it is present and up to date."""
+        if not PYARROW_AVAILABLE:
+            return False
+        if not (self.store_path.exists() and self.store_index_path.exists()):
+            return False
+        
+        try:
+            data_mtime = self.dataset_path.stat().st_mtime
+            if min(self.store_path.stat().st_mtime, self.store_index_path.stat().st_mtime) <= data_mtime:
+                return False
+            
+            print(f"Using review store: {self.store_path}")
+            with open(self.store_index_path, 'r') as f:
+                self._store_index = json.load(f)
+            self._store_table = pa.ipc.open_file(pa.memory_map(str(self.store_path), 'r')).read_all()
+            self._loaded = True
+            return True
+        except Exception as e:
+            print(f"Review store load failed: {e}")
+            self._store_index = None
+            self._store_table = None
+            return False
+    
+    def _read_product(self, asin: str, max_reviews: Optional[int] = None) -> tuple[list, float]:
+        """Materialize one product's reviews from the review store, plus its mean stars."""
+        row_start, row_count, _ = self._store_index[asin]
+        table = self._store_table.slice(row_start, row_count)
+        average_stars = float(table.column("stars").to_numpy().mean())
+        if max_reviews is not None:
+            table = table.slice(0, max_reviews)
+        return table.to_pylist(), average_stars
+    
     def _load_from_cache(self) -> bool:
         """Try to load from cache. Returns True if successful."""
         if self.cache_path.exists():
@@ -64,25 +273,65 @@ class DatasetLoader:
                 # Only use cache if it's newer than the data
                 if cache_mtime > data_mtime:
                     print(f"Loading from cache: {self.cache_path}")
-                    with open(self.cache_path, 'rb') as f:
-                        cached = pickle.load(f)
-                        self._product_index = cached['index']
-                        self._review_data = cached['reviews']
-                        self._loaded = True
-                        return True
+                    if MSGPACK_ZSTD_AVAILABLE:
+                        columns, asin_names = self._read_msgpack_cache()
+                    else:
+                        with open(self.cache_path, 'rb') as f:
+                            cached = pickle.load(f)
+                            columns, asin_names = cached['columns'], cached['asin_names']
+                    self._set_columns(columns, asin_names)
+                    self._loaded = True
+                    return True
             except Exception as e:
                 print(f"Cache load failed: {e}")
         return False
     
+    def _write_msgpack_cache(self):
+        """
+        Write each column in REVIEW_FIELDS order, then the ASIN names, as a zstd msgpack stream.
+        
+        Numeric columns go out as raw array bytes; string columns as an
+        array header plus one string at a time, which keeps the unpacker's
+        buffer bounded on read.
+        """
+        packer = msgpack.Packer(use_bin_type=True)
+        cctx = zstandard.ZstdCompressor(level=3, threads=-1)
+        tmp_path = self.cache_path.with_suffix(".zst.tmp")
+        with open(tmp_path, 'wb') as f, cctx.stream_writer(f) as z:
+            for field in REVIEW_FIELDS:
+                column = self._review_columns[field]
+                if field in NUMERIC_COLUMNS:
+                    z.write(packer.pack(column.tobytes()))
+                    continue
+                z.write(packer.pack_array_header(len(column)))
+                for value in column:
+                    z.write(packer.pack(value))
+            z.write(packer.pack(self._asin_names))
+        os.replace(tmp_path, self.cache_path)
+    
+    def _read_msgpack_cache(self) -> tuple[dict, list]:
+        """Read a cache written by _write_msgpack_cache."""
+        with open(self.cache_path, 'rb') as f, zstandard.ZstdDecompressor().stream_reader(f) as z:
+            # Numeric columns are single bin objects, so lift the 100 MiB default cap
+            unpacker = msgpack.Unpacker(z, raw=False, max_buffer_size=2**31 - 1)
+            columns = {}
+            for field in REVIEW_FIELDS:
+                if field in NUMERIC_COLUMNS:
+                    columns[field] = np.frombuffer(unpacker.unpack(), dtype=NUMERIC_COLUMNS[field])
+                else:
+                    columns[field] = [unpacker.unpack() for _ in range(unpacker.read_array_header())]
+            asin_names = unpacker.unpack()
+        return columns, asin_names
+    
     def _save_to_cache(self):
         """Save processed data to cache."""
         try:
             print(f"Saving to cache: {self.cache_path}")
+            if MSGPACK_ZSTD_AVAILABLE:
+                self._write_msgpack_cache()
+                return
             with open(self.cache_path, 'wb') as f:
-                pickle.dump({
-                    'index': self._product_index,
-                    'reviews': self._review_data
-                }, f)
+                pickle.dump({'columns': self._review_columns, 'asin_names': self._asin_names}, f)
         except Exception as e:
             print(f"Cache save failed: {e}")
     
@@ -97,60 +346,91 @@ class DatasetLoader:
         if self._loaded:
             return
         
-        # Try cache first
-        if max_reviews is None and self._load_from_cache():
-            return
+        # Full loads go through the review store when pyarrow is available
+        # (built on first cold start), then the index cache
+        if max_reviews is None:
+            if self._load_store():
+                return
+            if self.build_store(show_progress) and self._load_store():
+                return
+            if self._load_from_cache():
+                return
         
         if show_progress:
             print(f"Loading dataset: {self.dataset_path}")
         
-        self._product_index = defaultdict(list)
-        self._review_data = []
+        columns = {field: [] for field in REVIEW_FIELDS}
+        appends = [values.append for values in columns.values()]
         
         # Stream the gzipped file
-        with gzip.open(self.dataset_path, 'rt', encoding='utf-8') as f:
-            for i, line in enumerate(f):
-                if max_reviews and i >= max_reviews:
-                    break
-                
-                if show_progress and i % 50000 == 0:
-                    print(f"  Loaded {i:,} reviews...")
-                
-                try:
-                    review = json.loads(line)
-                    
-                    # Store review with index
-                    review_entry = {
-                        "id": i,
-                        "stars": int(review.get("overall", 3)),
-                        "text": review.get("reviewText", ""),
-                        "summary": review.get("summary", ""),
-                        "verified": review.get("verified", False),
-                        "date": review.get("reviewTime", ""),
-                        "asin": review.get("asin", "")
-                    }
-                    
-                    self._review_data.append(review_entry)
-                    self._product_index[review["asin"]].append(i)
-                    
-                except (json.JSONDecodeError, KeyError) as e:
-                    continue
+        for row in self._iter_reviews(max_reviews, show_progress):
+            for append, value in zip(appends, row):
+                append(value)
         
+        asin_ids = {}
+        columns["asin"] = [asin_ids.setdefault(asin, len(asin_ids)) for asin in columns["asin"]]
+        for field, dtype in NUMERIC_COLUMNS.items():
+            columns[field] = np.array(columns[field], dtype=dtype)
+        self._set_columns(columns, list(asin_ids))
         self._loaded = True
         
         if show_progress:
-            print(f"  Total: {len(self._review_data):,} reviews, {len(self._product_index):,} products")
+            print(f"  Total: {self._review_count():,} reviews, {len(self._asin_names):,} products")
         
         # Cache if we loaded everything
         if max_reviews is None:
             self._save_to_cache()
     
-    def get_product(self, asin: str) -> Optional[dict]:
+    def _set_columns(self, columns: dict, asin_names: list):
+        """
+        Install loaded columns and index the asin id column CSR-style.
+        
+        rows holds row numbers stably sorted by asin id (file order within a
+        product) and asin id i owns rows[offsets[i]:offsets[i + 1]].
+        """
+        self._review_columns = columns
+        self._asin_names = asin_names
+        self._asin_ids = {asin: i for i, asin in enumerate(asin_names)}
+        
+        rows = np.argsort(columns["asin"], kind="stable")
+        offsets = np.zeros(len(asin_names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns["asin"], minlength=len(asin_names)), out=offsets[1:])
+        self._product_index = {"rows": rows, "offsets": offsets}
+    
+    def _product_rows(self, asin: str) -> Optional[np.ndarray]:
+        """Row numbers of one product's reviews, or None if the ASIN is unknown."""
+        asin_id = self._asin_ids.get(asin)
+        if asin_id is None:
+            return None
+        offsets = self._product_index["offsets"]
+        return self._product_index["rows"][offsets[asin_id]:offsets[asin_id + 1]]
+    
+    def _review_count(self) -> int:
+        """Number of reviews held in memory."""
+        return len(self._review_columns["id"])
+    
+    def _review_rows(self, rows: np.ndarray) -> list:
+        """Rebuild review dicts for the given rows."""
+        cols = self._review_columns
+        row_list = rows.tolist()
+        values = [
+            cols[field][rows].tolist() if field in NUMERIC_COLUMNS else [cols[field][i] for i in row_list]
+            for field in REVIEW_FIELDS
+        ]
+        values[-1] = [self._asin_names[i] for i in values[-1]]
+        return [dict(zip(REVIEW_FIELDS, row)) for row in zip(*values)]
+    
+    def get_product(self, asin: str, max_reviews: Optional[int] = None) -> Optional[dict]:
         """
         Get all reviews for a product.
         
+        average_stars is one NumPy mean over the product's stars column
+        (integer sum is exact in float64, so it equals sum(stars) / n).
+        
         Args:
             asin: Amazon Standard Identification Number
+            max_reviews: Only build dicts for the first N reviews (None = all);
+                review_count and average_stars still cover every review
             
         Returns:
             dict with asin, reviews list, review_count, or None if not found
@@ -158,17 +438,25 @@ class DatasetLoader:
         if not self._loaded:
             self.load()
         
-        if asin not in self._product_index:
-            return None
-        
-        review_indices = self._product_index[asin]
-        reviews = [self._review_data[i] for i in review_indices]
+        if self._store_index is not None:
+            if asin not in self._store_index:
+                return None
+            review_count = self._store_index[asin][1]
+            reviews, average_stars = self._read_product(asin, max_reviews)
+        else:
+            rows = self._product_rows(asin)
+            if rows is None:
+                return None
+            
+            review_count = len(rows)
+            average_stars = float(self._review_columns["stars"][rows].mean())
+            reviews = self._review_rows(rows[:max_reviews])
         
         return {
             "asin": asin,
             "reviews": reviews,
-            "review_count": len(reviews),
-            "average_stars": sum(r["stars"] for r in reviews) / len(reviews) if reviews else 0
+            "review_count": review_count,
+            "average_stars": average_stars
         }
     
     def search_products(self, query: str = "", limit: int = 20) -> list:
@@ -187,15 +475,29 @@ class DatasetLoader:
         
         # Sort products by review count
         products = []
-        for asin, review_indices in self._product_index.items():
-            if len(review_indices) >= 5:  # Only products with 5+ reviews
+        if self._store_index is not None:
+            for asin, (_, review_count, sample_summary) in self._store_index.items():
+                if review_count >= 5:
+                    products.append({
+                        "asin": asin,
+                        "review_count": review_count,
+                        "sample_summary": sample_summary
+                    })
+        
+        if self._product_index is not None:
+            offsets = self._product_index["offsets"]
+            counts = np.diff(offsets)
+            # Stable on asin id, so ties keep first-appearance order
+            top = np.argsort(-counts, kind="stable")
+            top = top[counts[top] >= 5][:limit]  # Only products with 5+ reviews
+            for asin_id in top.tolist():
                 # Get a sample review for context
-                sample = self._review_data[review_indices[0]]
+                sample_summary = self._review_columns["summary"][self._product_index["rows"][offsets[asin_id]]]
                 
                 products.append({
-                    "asin": asin,
-                    "review_count": len(review_indices),
-                    "sample_summary": sample.get("summary", "")[:50]
+                    "asin": self._asin_names[asin_id],
+                    "review_count": int(counts[asin_id]),
+                    "sample_summary": sample_summary[:50]
                 })
         
         # Sort by review count descending
@@ -208,10 +510,20 @@ class DatasetLoader:
         if not self._loaded:
             self.load()
         
+        if self._store_index is not None:
+            total_reviews = sum(entry[1] for entry in self._store_index.values())
+            return {
+                "total_reviews": total_reviews,
+                "total_products": len(self._store_index),
+                "avg_reviews_per_product": total_reviews / len(self._store_index) if self._store_index else 0
+            }
+        
+        total_reviews = self._review_count()
+        total_products = len(self._asin_names)
         return {
-            "total_reviews": len(self._review_data),
-            "total_products": len(self._product_index),
-            "avg_reviews_per_product": len(self._review_data) / len(self._product_index) if self._product_index else 0
+            "total_reviews": total_reviews,
+            "total_products": total_products,
+            "avg_reviews_per_product": total_reviews / total_products if total_products else 0
         }
 
 
@@ -229,10 +541,16 @@ def main():
     parser.add_argument("--max", type=int, help="Max reviews to load")
     parser.add_argument("--asin", help="Get reviews for specific ASIN")
     parser.add_argument("--top", type=int, default=10, help="Show top N products by review count")
+    parser.add_argument("--build-store", action="store_true", help="(Re)build the review store and exit")
     
     args = parser.parse_args()
     
     loader = DatasetLoader(args.data)
+    if args.build_store:
+        if not PYARROW_AVAILABLE:
+            print("pyarrow not installed. Run: pip install pyarrow")
+        loader.build_store()
+        return
     loader.load(max_reviews=args.max)
     
     # Show stats
@@ -17,15 +17,72 @@ Cost: $0 (all local processing)
 import json
 import csv
 import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional, Generator
 from datetime import datetime
 
+import numpy as np
+
 # Import execution modules
 from analyze_sentiment import SentimentAnalyzer
 from score_credibility import CredibilityScorer
 from detect_sarcasm import SarcasmDetector
 from calculate_weighted_rating import WeightedRatingCalculator
+from review_features import prepare
+
+# Try importing orjson (optional, faster results encoding)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try importing ijson (optional, streams JSON arrays; picks the yajl2_c
+# backend when its C extension is built)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Try importing msgpack + zstandard (optional, compact binary results output)
+try:
+    import msgpack
+    import zstandard
+    MSGPACK_ZSTD_AVAILABLE = True
+except ImportError:
+    MSGPACK_ZSTD_AVAILABLE = False
+
+# Try importing pyarrow (optional, C++ CSV parser for load_csv)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Below this many reviews per worker, process start-up and model loading
+# cost more than the parallel speedup
+MIN_REVIEWS_PER_WORKER = 500
+
+# Credibility classes in aggregate_product's breakdown order
+CLASS_CODES = {"bot": 0, "low_effort": 1, "human": 2}
+
+# Per-process pipeline for process_batch workers (built by _pool_initializer)
+_worker_processor = None
+
+
+def _pool_initializer(sentiment_mode: str, star_weight: float, sentiment_weight: float):
+    """Build this worker process's ReviewProcessor once."""
+    global _worker_processor
+    _worker_processor = ReviewProcessor(sentiment_mode, star_weight, sentiment_weight)
+
+
+def _process_chunk(reviews: list[dict]) -> list[dict]:
+    """Worker entry point: run one contiguous slice of a batch."""
+    return _worker_processor.process_batch(reviews, show_progress=False)
 
 
 class ReviewProcessor:
@@ -71,15 +128,19 @@ class ReviewProcessor:
         text = review.get("text", "")
         stars = review.get("stars", 3)
         
+        # Strip/lower/split once, shared by all three signals
+        features = prepare(text)
+        
         # Step 1: Sentiment Analysis
-        sentiment_result = self.sentiment_analyzer.analyze(text)
+        sentiment_result = self.sentiment_analyzer.analyze(text, features=features)
         sentiment_score = sentiment_result.get("sentiment_score", 0.0)
         
         # Step 2: Credibility Scoring
         credibility_result = self.credibility_scorer.score(
             text=text,
             stars=stars,
-            sentiment_score=sentiment_score
+            sentiment_score=sentiment_score,
+            features=features
         )
         credibility = credibility_result.get("score", 1.0)
         
@@ -87,13 +148,14 @@ class ReviewProcessor:
         sarcasm_result = self.sarcasm_detector.detect(
             text=text,
             stars=stars,
-            sentiment_score=sentiment_score
+            sentiment_score=sentiment_score,
+            features=features
         )
         is_sarcastic = sarcasm_result.get("is_sarcastic", False)
         sarcasm_confidence = sarcasm_result.get("confidence", 0.0)
         
         # Step 4: Weighted Rating Calculation
-        rating_result = self.rating_calculator.calculate(
+        adjusted_rating = self.rating_calculator.calculate_rating(
             stars=stars,
             sentiment_score=sentiment_score,
             credibility=credibility,
@@ -101,6 +163,20 @@ class ReviewProcessor:
             sarcasm_confidence=sarcasm_confidence
         )
         
+        return self._result_dict(
+            review, text, stars, sentiment_result, credibility_result, sarcasm_result, adjusted_rating
+        )
+    
+    def _result_dict(self, review: dict, text: str, stars, sentiment_result: dict,
+                     credibility_result: dict, sarcasm_result: dict, adjusted_rating: float) -> dict:
+        """
+        Assemble the per-review output shared by process_review/process_batch.
+        
+        The nested literals already compile to one BUILD_CONST_KEY_MAP each
+        (no per-key stores), about 1.6 us a review against ~1.5 ms of
+        analysis, so there is nothing for a generated builder to remove.
+        """
+        is_sarcastic = sarcasm_result.get("is_sarcastic", False)
         return {
             "original": {
                 "text": text,
@@ -115,39 +191,116 @@ class ReviewProcessor:
                 "sarcasm": sarcasm_result
             },
             "result": {
-                "adjusted_rating": rating_result["adjusted_rating"],
+                "adjusted_rating": adjusted_rating,
                 "original_stars": stars,
-                "rating_delta": round(rating_result["adjusted_rating"] - stars, 2),
+                "rating_delta": round(adjusted_rating - stars, 2),
                 "classification": credibility_result["classification"],
                 "is_sarcastic": is_sarcastic
             }
         }
     
-    def process_batch(self, reviews: list[dict], show_progress: bool = True) -> list[dict]:
+    def process_batch(self, reviews: list[dict], show_progress: bool = True,
+                      workers: int = 1) -> list[dict]:
         """
         Process multiple reviews.
         
+        Runs stage by stage over the whole batch instead of review by review:
+        one analyze_batch() call for sentiment (duplicates analyzed once,
+        escalations batched into the transformer), one score_vec() call for
+        credibility, then sarcasm and rating per row. Results are the same
+        as process_review() on each review.
+        
         Args:
             reviews: List of review dicts
             show_progress: Print progress updates
+            workers: Worker processes (0 = os.cpu_count()); the batch is split
+                into one contiguous chunk per worker, each with its own models
             
         Returns:
             List of processed results
         """
-        results = []
         total = len(reviews)
+        workers = min(workers or os.cpu_count() or 1, total // MIN_REVIEWS_PER_WORKER)
+        if workers > 1:
+            return self._process_parallel(reviews, workers, show_progress)
         
-        for i, review in enumerate(reviews):
-            if show_progress and i % 100 == 0:
-                print(f"Processing {i}/{total} reviews...")
-            
-            results.append(self.process_review(review))
+        texts = [review.get("text", "") for review in reviews]
+        stars = [review.get("stars", 3) for review in reviews]
+        
+        # Strip/lower/split once, shared by all three signals
+        features = [prepare(text) for text in texts]
+        
+        # Step 1: Sentiment Analysis (batched)
+        sentiments = self.sentiment_analyzer.analyze_batch(texts, show_progress=show_progress)
+        sentiment_scores = [s.get("sentiment_score", 0.0) for s in sentiments]
+        
+        # Step 2: Credibility Scoring (struct of arrays)
+        credibility = self.credibility_scorer.score_vec(
+            texts, np.asarray(stars, dtype=np.float64), np.asarray(sentiment_scores, dtype=np.float64),
+            features=features
+        )
+        credibilities = [
+            {"score": score, "classification": classification, "flags": flags}
+            for score, classification, flags in zip(
+                credibility["scores"].tolist(), credibility["classifications"].tolist(), credibility["flags"]
+            )
+        ]
+        
+        # Step 3: Sarcasm Detection
+        sarcasms = [
+            self.sarcasm_detector.detect(text=text, stars=star, sentiment_score=sentiment_score, features=f)
+            for text, star, sentiment_score, f in zip(texts, stars, sentiment_scores, features)
+        ]
+        
+        # Step 4: Weighted Rating Calculation (row-wise calculate_rating keeps
+        # Python round(), which np.round doesn't match on every tie)
+        adjusted = [
+            self.rating_calculator.calculate_rating(
+                stars=star,
+                sentiment_score=sentiment_score,
+                credibility=cred["score"],
+                is_sarcastic=sarcasm.get("is_sarcastic", False),
+                sarcasm_confidence=sarcasm.get("confidence", 0.0)
+            )
+            for star, sentiment_score, cred, sarcasm in zip(stars, sentiment_scores, credibilities, sarcasms)
+        ]
+        
+        results = [
+            self._result_dict(review, text, star, sentiment, cred, sarcasm, adjusted_rating)
+            for review, text, star, sentiment, cred, sarcasm, adjusted_rating in zip(
+                reviews, texts, stars, sentiments, credibilities, sarcasms, adjusted
+            )
+        ]
         
         if show_progress:
             print(f"✓ Completed {total} reviews")
         
         return results
     
+    def _process_parallel(self, reviews: list[dict], workers: int, show_progress: bool) -> list[dict]:
+        """Split a batch across worker processes; results keep input order."""
+        # Chunks are pickled to the workers as plain review dicts: for 10k
+        # reviews that is ~15 ms against ~15 s of analysis, so shared-memory
+        # hand-off of the inputs would not pay for its bookkeeping
+        chunk_size = -(-len(reviews) // workers)
+        chunks = [reviews[i:i + chunk_size] for i in range(0, len(reviews), chunk_size)]
+        
+        if show_progress:
+            print(f"Processing {len(reviews)} reviews in {len(chunks)} worker processes...")
+        
+        init_args = (
+            self.sentiment_analyzer.mode,
+            self.rating_calculator.star_weight,
+            self.rating_calculator.sentiment_weight
+        )
+        with ProcessPoolExecutor(max_workers=len(chunks), initializer=_pool_initializer, initargs=init_args) as pool:
+            results = [result for chunk in pool.map(_process_chunk, chunks, chunksize=1) for result in chunk]
+        
+        if show_progress:
+            print(f"✓ Completed {len(reviews)} reviews")
+        
+        return results
+    
     def load_csv(self, filepath: str, 
                  text_column: str = "text",
                  stars_column: str = "stars",
@@ -161,6 +314,14 @@ class ReviewProcessor:
             stars_column: Column name for star rating
             max_rows: Maximum rows to load (None = all)
         """
+        if PYARROW_AVAILABLE:
+            try:
+                reviews = self._load_csv_arrow(filepath, text_column, stars_column, max_rows)
+                print(f"Loaded {len(reviews)} reviews from {filepath}")
+                return reviews
+            except pa.ArrowInvalid as e:
+                print(f"Warning: pyarrow CSV parse failed, falling back to csv module: {e}")
+        
         reviews = []
         
         with open(filepath, 'r', encoding='utf-8') as f:
@@ -178,32 +339,80 @@ class ReviewProcessor:
         print(f"Loaded {len(reviews)} reviews from {filepath}")
         return reviews
     
+    def _load_csv_arrow(self, filepath: str, text_column: str, stars_column: str,
+                        max_rows: Optional[int]) -> list[dict]:
+        """
+        load_csv() via pyarrow's streaming CSV reader.
+        
+        Every column is read as a string (as csv.DictReader gives them), and
+        the only conversion, int(float(stars)), runs once per distinct value.
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            header = next(csv.reader(f), [])
+        
+        reader = pa_csv.open_csv(
+            filepath,
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in header})
+        )
+        batches = []
+        n_rows = 0
+        for batch in reader:
+            batches.append(batch)
+            n_rows += batch.num_rows
+            if max_rows and n_rows >= max_rows:
+                break
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+        if max_rows:
+            table = table.slice(0, max_rows)
+        
+        n_rows = table.num_rows
+        texts = table.column(text_column).to_pylist() if text_column in header else [""] * n_rows
+        if stars_column in header:
+            star_values = table.column(stars_column).to_pylist()
+            star_ints = {value: int(float(value)) for value in set(star_values)}
+            stars = [star_ints[value] for value in star_values]
+        else:
+            stars = [3] * n_rows
+        
+        extra_names = [name for name in table.column_names if name not in [text_column, stars_column]]
+        extra_columns = [table.column(name).to_pylist() for name in extra_names]
+        return [
+            {"text": text, "stars": star, **dict(zip(extra_names, extra))}
+            for text, star, *extra in zip(texts, stars, *extra_columns)
+        ]
+    
     def load_json(self, filepath: str, max_rows: Optional[int] = None) -> list[dict]:
         """
         Load reviews from JSON file (array or JSONL).
+        
+        Arrays are streamed item by item with ijson when it is installed, so
+        only the normalized reviews are held in memory, not the whole parsed
+        document.
         """
         reviews = []
         
-        # Handle gzipped files
+        # Handle gzipped files (read as bytes: ijson, orjson and json all take UTF-8)
         opener = gzip.open if filepath.endswith('.gz') else open
         
-        with opener(filepath, 'rt', encoding='utf-8') as f:
+        with opener(filepath, 'rb') as f:
             first_char = f.read(1)
             f.seek(0)
             
-            if first_char == '[':
+            if first_char == b'[':
                 # JSON array
-                data = json.load(f)
+                data = ijson.items(f, 'item', use_float=True) if IJSON_AVAILABLE else json.load(f)
                 for i, item in enumerate(data):
                     if max_rows and i >= max_rows:
                         break
                     reviews.append(self._normalize_review(item))
             else:
                 # JSONL (one JSON per line)
+                loads = orjson.loads if ORJSON_AVAILABLE else json.loads
                 for i, line in enumerate(f):
                     if max_rows and i >= max_rows:
                         break
-                    reviews.append(self._normalize_review(json.loads(line)))
+                    reviews.append(self._normalize_review(loads(line)))
         
         print(f"Loaded {len(reviews)} reviews from {filepath}")
         return reviews
@@ -222,40 +431,53 @@ class ReviewProcessor:
         """
         Aggregate results by product for product-level statistics.
         
+        Reviews are grouped by integer product code and every per-product
+        count and sum is one np.bincount over the whole batch. Weighted
+        bincount accumulates in input order, like the sequential sum() it
+        replaces, so the figures are unchanged.
+        
         Returns:
             Dict of product_id → aggregated stats
         """
-        from collections import defaultdict
+        # Product codes in order of first appearance
+        codes = {}
+        group = np.fromiter(
+            (codes.setdefault(r["original"]["product_id"], len(codes)) for r in results),
+            dtype=np.int64, count=len(results)
+        )
+        n_products = len(codes)
         
-        products = defaultdict(list)
+        original = np.array([r["original"]["stars"] for r in results], dtype=np.float64)
+        adjusted = np.array([r["result"]["adjusted_rating"] for r in results], dtype=np.float64)
+        class_codes = np.array(
+            [CLASS_CODES.get(r["result"]["classification"], len(CLASS_CODES)) for r in results],
+            dtype=np.int64
+        )
+        sarcastic = np.array([bool(r["result"]["is_sarcastic"]) for r in results], dtype=bool)
         
-        for result in results:
-            product_id = result["original"]["product_id"]
-            products[product_id].append(result)
+        counts = np.bincount(group, minlength=n_products).tolist()
+        original_sums = np.bincount(group, weights=original, minlength=n_products).tolist()
+        adjusted_sums = np.bincount(group, weights=adjusted, minlength=n_products).tolist()
+        # Every product's bot/low_effort/human counts in a single pass; one
+        # extra column catches any classification outside CLASS_CODES
+        class_counts = np.bincount(
+            group * (len(CLASS_CODES) + 1) + class_codes, minlength=n_products * (len(CLASS_CODES) + 1)
+        ).reshape(n_products, len(CLASS_CODES) + 1).tolist()
+        sarcastic_counts = np.bincount(group[sarcastic], minlength=n_products).tolist()
         
         aggregated = {}
         
-        for product_id, product_results in products.items():
-            n = len(product_results)
-            
-            # Calculate averages
-            original_ratings = [r["original"]["stars"] for r in product_results]
-            adjusted_ratings = [r["result"]["adjusted_rating"] for r in product_results]
-            
-            # Count classifications
-            classifications = [r["result"]["classification"] for r in product_results]
-            bot_count = classifications.count("bot")
-            low_effort_count = classifications.count("low_effort")
-            human_count = classifications.count("human")
-            
-            sarcastic_count = sum(1 for r in product_results if r["result"]["is_sarcastic"])
+        for product_id, n, original_sum, adjusted_sum, classes, sarcastic_count in zip(
+            codes, counts, original_sums, adjusted_sums, class_counts, sarcastic_counts
+        ):
+            bot_count, low_effort_count, human_count = classes[:3]
             
             aggregated[product_id] = {
                 "product_id": product_id,
                 "total_reviews": n,
-                "original_average": round(sum(original_ratings) / n, 2),
-                "adjusted_average": round(sum(adjusted_ratings) / n, 2),
-                "rating_difference": round(sum(adjusted_ratings) / n - sum(original_ratings) / n, 2),
+                "original_average": round(original_sum / n, 2),
+                "adjusted_average": round(adjusted_sum / n, 2),
+                "rating_difference": round(adjusted_sum / n - original_sum / n, 2),
                 "review_breakdown": {
                     "bot": bot_count,
                     "low_effort": low_effort_count,
@@ -268,8 +490,17 @@ class ReviewProcessor:
         
         return aggregated
     
-    def save_results(self, results: list[dict], filepath: str):
-        """Save results to JSON file."""
+    def save_results(self, results: list[dict], filepath: str, fmt: str = "json"):
+        """
+        Save results to a file.
+        
+        Args:
+            results: Processed results
+            filepath: Output path
+            fmt: "json" (indented, for inspection) or "msgpack" (zstd-compressed
+                msgpack, for other Python services; falls back to JSON if
+                msgpack/zstandard are missing)
+        """
         output = {
             "meta": {
                 "generated_at": datetime.now().isoformat(),
@@ -282,36 +513,53 @@ class ReviewProcessor:
             "results": results
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2)
+        if fmt == "msgpack" and not MSGPACK_ZSTD_AVAILABLE:
+            print("Warning: msgpack/zstandard not installed, saving JSON instead")
+            fmt = "json"
+        
+        if fmt == "msgpack":
+            cctx = zstandard.ZstdCompressor(level=3, threads=-1)
+            with open(filepath, 'wb') as f, cctx.stream_writer(f) as z:
+                msgpack.pack(output, z, use_bin_type=True)
+        elif ORJSON_AVAILABLE:
+            # One encode straight to bytes (UTF-8 rather than \u escapes)
+            with open(filepath, 'wb', buffering=1 << 20) as f:
+                f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(output, f, indent=2)
         
         print(f"✓ Saved results to {filepath}")
     
     def process_csv(self, input_path: str, 
                     output_path: Optional[str] = None,
-                    max_rows: Optional[int] = None) -> list[dict]:
+                    max_rows: Optional[int] = None,
+                    workers: int = 1,
+                    fmt: str = "json") -> list[dict]:
         """
         Convenience method: Load CSV, process, save results.
         """
         reviews = self.load_csv(input_path, max_rows=max_rows)
-        results = self.process_batch(reviews)
+        results = self.process_batch(reviews, workers=workers)
         
         if output_path:
-            self.save_results(results, output_path)
+            self.save_results(results, output_path, fmt)
         
         return results
     
     def process_json(self, input_path: str,
                      output_path: Optional[str] = None,
-                     max_rows: Optional[int] = None) -> list[dict]:
+                     max_rows: Optional[int] = None,
+                     workers: int = 1,
+                     fmt: str = "json") -> list[dict]:
         """
         Convenience method: Load JSON/JSONL, process, save results.
         """
         reviews = self.load_json(input_path, max_rows=max_rows)
-        results = self.process_batch(reviews)
+        results = self.process_batch(reviews, workers=workers)
         
         if output_path:
-            self.save_results(results, output_path)
+            self.save_results(results, output_path, fmt)
         
         return results
 
@@ -326,10 +574,13 @@ def main():
     
     parser = argparse.ArgumentParser(description="Process batch reviews")
     parser.add_argument("input", help="Input file (CSV, JSON, or JSONL)")
-    parser.add_argument("-o", "--output", help="Output JSON file")
+    parser.add_argument("-o", "--output", help="Output file")
+    parser.add_argument("--format", choices=["json", "msgpack"], default="json",
+                        help="Output format (msgpack = zstd-compressed msgpack)")
     parser.add_argument("--max-rows", type=int, help="Max reviews to process")
     parser.add_argument("--mode", choices=["vader", "transformer", "hybrid"], default="hybrid")
     parser.add_argument("--star-weight", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = one per CPU)")
     
     args = parser.parse_args()
     
@@ -342,9 +593,9 @@ def main():
     input_path = Path(args.input)
     
     if input_path.suffix == '.csv':
-        results = processor.process_csv(args.input, args.output, args.max_rows)
+        results = processor.process_csv(args.input, args.output, args.max_rows, args.workers, args.format)
     else:
-        results = processor.process_json(args.input, args.output, args.max_rows)
+        results = processor.process_json(args.input, args.output, args.max_rows, args.workers, args.format)
     
     # Print summary
     aggregated = processor.aggregate_product(results)
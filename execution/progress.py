@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Progress Module
+===============
+Throttled "<label> i/total..." lines for the batch loops, so a large batch
+doesn't flood the log with one line per hundred reviews.
+
+Usage:
+    from progress import ProgressPrinter
+    
+    progress = ProgressPrinter("Scoring", len(reviews), enabled=show_progress)
+    for i, review in enumerate(reviews):
+        progress.update(i)
+        ...
+
+Cost: $0 (all local processing)
+"""
+
+import time
+
+
+class ProgressPrinter:
+    """Prints "<label> i/total..." at most once per `interval` seconds."""
+    
+    def __init__(self, label: str, total: int, enabled: bool = True,
+                 every: int = 100, interval: float = 1.0):
+        """
+        Args:
+            label: Text before the count, e.g. "Scoring"
+            total: Number of items in the batch
+            enabled: Print nothing when False
+            every: Only look at the clock on every Nth index (keeps the
+                per-item cost of update() to one modulo)
+            interval: Minimum seconds between lines
+        """
+        self.label = label
+        self.total = total
+        self.enabled = enabled
+        self.every = every
+        self.interval = interval
+        self._next_report = 0.0
+    
+    def update(self, i: int) -> None:
+        """Report position i if enough time has passed since the last line."""
+        if not self.enabled or i % self.every:
+            return
+        now = time.monotonic()
+        if now >= self._next_report:
+            print(f"{self.label} {i}/{self.total}...")
+            self._next_report = now + self.interval
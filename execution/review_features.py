@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Review Features Module
+======================
+Computes the shared text views (stripped, lowercased, tokens, lengths) of a
+review once, so sentiment, credibility and sarcasm don't each redo them.
+
+Usage:
+    from execution.review_features import prepare
+    
+    features = prepare("Oh great, it broke after 2 days!")
+    scorer.score(features.text, stars=5, features=features)
+    detector.detect(features.text, stars=5, features=features)
+
+Cost: $0 (all local processing)
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class ReviewFeatures:
+    """
+    Precomputed views of one review's text.
+    
+    Attributes:
+        text: Original text ("" if None)
+        stripped: text.strip()
+        lowered: text.lower() (unstripped, for substring checks)
+        stripped_lower: stripped.lower()
+        tokens: Whitespace tokens (text.split())
+        n_words: len(tokens)
+        n_chars: len(stripped)
+    """
+    text: str
+    stripped: str
+    lowered: str
+    stripped_lower: str
+    tokens: list
+    n_words: int
+    n_chars: int
+
+
+def prepare(text: Optional[str]) -> ReviewFeatures:
+    """Build the feature bundle for a review text."""
+    text = text or ""
+    stripped = text.strip()
+    lowered = text.lower()
+    tokens = text.split()
+    
+    return ReviewFeatures(
+        text=text,
+        stripped=stripped,
+        lowered=lowered,
+        # Whitespace is unaffected by lower(), so this equals stripped.lower()
+        stripped_lower=lowered.strip(),
+        tokens=tokens,
+        n_words=len(tokens),
+        n_chars=len(stripped)
+    )
@@ -15,8 +15,99 @@ Cost: $0 (all local processing)
 """
 
 import re
+import threading
 from typing import Optional
 
+import numpy as np
+
+from review_features import ReviewFeatures, prepare
+from progress import ProgressPrinter
+
+# Try importing hyperscan (optional, matches the keyword lists and regexes in one pass)
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Try importing pyahocorasick (optional, single-pass fallback without hyperscan)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Try importing numba (optional, JIT-compiles the batch kernel)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Reviews per score_vec call in score_batch (keeps progress output going)
+SCORE_BATCH_CHUNK = 1000
+
+# Pattern ids for the hyperscan matcher: one per keyword list and for the
+# spam templates, then _FEATURE_BASE + i for SPECIFIC_FEATURES[i]
+_NOT_USED, _MIXED, _SPAM, _FEATURE_BASE = 0, 1, 2, 3
+
+# Classification codes written by the batch kernel
+CLASSIFICATIONS = np.array(["bot", "low_effort", "human"])
+
+
+# ============================================
+# Batch Kernel
+# ============================================
+
+def _score_kernel(empty, generic, very_short, short, spam, not_used, all_caps,
+                  mismatch, mixed, features, word_count, out_score, out_cls):
+    """
+    Credibility multipliers, clamp and classification over whole arrays.
+    
+    Same factors in the same order as score(), so products are bit-identical
+    (no fastmath). Serial only: batches come from API executor threads, and
+    the per-review text scans cost far more than this loop.
+    """
+    for i in range(out_score.size):
+        s = 1.0
+        if empty[i]:
+            s *= 0.1
+        if generic[i]:
+            s *= 0.2
+        if very_short[i]:
+            s *= 0.5
+        if short[i]:
+            s *= 0.7
+        if spam[i]:
+            s *= 0.3
+        if not_used[i]:
+            s *= 0.15
+        if all_caps[i]:
+            s *= 0.6
+        if mismatch[i]:
+            s *= 0.7
+        if mixed[i]:
+            s *= 1.2
+        if features[i] >= 2:
+            s *= 1.15
+        if word_count[i] >= 50:
+            s *= 1.1
+        if word_count[i] >= 100:
+            s *= 1.1
+        
+        s = max(0.0, min(1.0, s))
+        out_score[i] = s
+        if s < 0.3:
+            out_cls[i] = 0
+        elif s < 0.6:
+            out_cls[i] = 1
+        else:
+            out_cls[i] = 2
+
+
+if NUMBA_AVAILABLE:
+    _score_kernel = njit(cache=True)(_score_kernel)
+
 
 class CredibilityScorer:
     """
@@ -29,12 +120,12 @@ class CredibilityScorer:
     """
     
     # Generic phrases that indicate low-effort reviews
-    GENERIC_PHRASES = {
+    GENERIC_PHRASES = frozenset({
         "good", "nice", "great", "amazing", "excellent", "perfect", 
         "love it", "awesome", "best", "wonderful", "fantastic",
         "highly recommend", "5 stars", "five stars", "loved it",
         "bad", "terrible", "worst", "hate it", "awful", "horrible"
-    }
+    })
     
     # Spam template patterns
     SPAM_PATTERNS = [
@@ -55,12 +146,13 @@ class CredibilityScorer:
         "haven't tested", "can't rate yet"
     ]
     
-    # Words indicating mixed/nuanced review (good sign)
-    MIXED_SENTIMENT_WORDS = {
+    # Words indicating mixed/nuanced review (good sign); matched as whole
+    # words, so "butter" or "exceptional" don't count
+    MIXED_SENTIMENT_WORDS = frozenset({
         "but", "however", "although", "though", "except",
         "unfortunately", "sadly", "on the other hand",
         "pros", "cons", "downside", "upside"
-    }
+    })
     
     # Specific feature mentions (good sign)
     SPECIFIC_FEATURES = [
@@ -75,9 +167,91 @@ class CredibilityScorer:
         # Compile regex patterns for efficiency
         self._spam_patterns = [re.compile(p, re.IGNORECASE) for p in self.SPAM_PATTERNS]
         self._feature_patterns = [re.compile(p, re.IGNORECASE) for p in self.SPECIFIC_FEATURES]
+        
+        # Whole-word MIXED_SENTIMENT_WORDS check; whitespace tokens would miss
+        # "however," or "pros:", so this is a \b-bounded alternation
+        mixed_words = sorted(self.MIXED_SENTIMENT_WORDS)
+        self._mixed_pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, mixed_words)) + r")\b")
+        
+        # NOT_USED_INDICATORS are fixed strings, so one multi-pattern matcher
+        # (hyperscan, else Aho-Corasick) answers them in a single pass;
+        # pattern ids are the category. A fused re alternation measured
+        # 1.5-2x slower than the `in` loops it replaced.
+        keywords = [(k, _NOT_USED) for k in self.NOT_USED_INDICATORS]
+        self._hs_db = None
+        self._ac = None
+        self._hs_local = threading.local()  # Scratch space is per thread
+        
+        if HYPERSCAN_AVAILABLE:
+            # The mixed words, spam and feature regexes go in the same
+            # database. No HS_FLAG_CASELESS: the scanned text is already
+            # lowercased
+            expressions = [re.escape(k) for k, _ in keywords]
+            expressions += [r"\b" + re.escape(w) + r"\b" for w in mixed_words]
+            expressions += self.SPAM_PATTERNS + self.SPECIFIC_FEATURES
+            ids = [category for _, category in keywords]
+            ids += [_MIXED] * len(mixed_words)
+            ids += [_SPAM] * len(self.SPAM_PATTERNS)
+            ids += [_FEATURE_BASE + i for i in range(len(self.SPECIFIC_FEATURES))]
+            try:
+                db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                db.compile(
+                    expressions=[e.encode("utf-8") for e in expressions],
+                    ids=ids,
+                    elements=len(expressions),
+                    flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+                )
+                self._hs_db = db
+            except Exception as e:
+                print(f"Warning: hyperscan compile failed, falling back: {e}")
+        
+        if self._hs_db is None and AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for keyword, category in keywords:
+                if keyword not in automaton:
+                    automaton.add_word(keyword, category)
+            automaton.make_automaton()
+            self._ac = automaton
+    
+    def _find_patterns(self, text_lower: str) -> tuple[bool, bool, bool, int]:
+        """
+        Run the keyword lists and the spam/feature regexes over text.
+        
+        Returns (spam, not_used, mixed, features_mentioned). Hyperscan's \\s,
+        \\b and case folding are ASCII-only where re's are Unicode ("\\xa0",
+        "\\u017f" ~ "s"), so non-ASCII text takes the regexes through re.
+        """
+        hits = None
+        if self._hs_db is not None:
+            scratch = getattr(self._hs_local, "scratch", None)
+            if scratch is None:
+                scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+            
+            hits = set()
+            self._hs_db.scan(
+                text_lower.encode("utf-8"),
+                match_event_handler=lambda id_, start, end, flags, ctx: hits.add(id_),
+                scratch=scratch
+            )
+            if text_lower.isascii():
+                features_mentioned = sum(1 for h in hits if h >= _FEATURE_BASE)
+                return _SPAM in hits, _NOT_USED in hits, _MIXED in hits, features_mentioned
+        elif self._ac is not None:
+            hits = {category for _, category in self._ac.iter(text_lower)}
+        
+        if hits is None:
+            not_used = any(i in text_lower for i in self.NOT_USED_INDICATORS)
+        else:
+            not_used = _NOT_USED in hits
+        
+        mixed = self._mixed_pattern.search(text_lower) is not None
+        spam = any(p.search(text_lower) for p in self._spam_patterns)
+        features_mentioned = sum(1 for p in self._feature_patterns if p.search(text_lower))
+        return spam, not_used, mixed, features_mentioned
     
     def score(self, text: str, stars: Optional[int] = None, 
-              sentiment_score: Optional[float] = None) -> dict:
+              sentiment_score: Optional[float] = None,
+              features: Optional[ReviewFeatures] = None) -> dict:
         """
         Calculate credibility score for a review.
         
@@ -85,6 +259,7 @@ class CredibilityScorer:
             text: Review text
             stars: Star rating (1-5), optional
             sentiment_score: Sentiment from analyzer (-1 to +1), optional
+            features: Precomputed prepare(text) bundle, optional
             
         Returns:
             score: 0.0 to 1.0 credibility
@@ -94,51 +269,50 @@ class CredibilityScorer:
         flags = []
         score = 1.0  # Start with full credibility
         
-        # Normalize text
-        text = text.strip() if text else ""
-        text_lower = text.lower()
-        word_count = len(text.split()) if text else 0
+        # No "already a bot" short-circuit past the empty check. The lowest
+        # score before Check 4 is 0.2 (generic phrase); such text is at most
+        # 5 words, so the 50/100-word boosts never apply, and even mixed +
+        # features together would only reach 0.276 - it is a bot either way.
+        # But every later check adds a flag callers read, and spam/not-used/
+        # mixed/features come from one _find_patterns pass anyway (~3.6us of
+        # ~8us per review), so gating them individually saves nothing.
+        scan = self._scan(text, features)
         
         # ============================================
         # NEGATIVE SIGNALS (Reduce credibility)
         # ============================================
         
         # Check 1: Empty or near-empty text
-        if not text or word_count < 2:
+        if scan["empty"]:
             score *= 0.1
             flags.append("empty_review")
             return self._build_result(score, flags)
         
         # Check 2: Very short + generic phrase
-        if word_count <= 5:
-            if text_lower.rstrip("!.") in self.GENERIC_PHRASES:
-                score *= 0.2
-                flags.append("generic_phrase")
-            else:
-                score *= 0.5
-                flags.append("very_short")
+        if scan["generic_phrase"]:
+            score *= 0.2
+            flags.append("generic_phrase")
+        elif scan["very_short"]:
+            score *= 0.5
+            flags.append("very_short")
         
         # Check 3: Short review (6-15 words)
-        elif word_count <= 15:
+        elif scan["short_review"]:
             score *= 0.7
             flags.append("short_review")
         
         # Check 4: Spam template matching
-        for pattern in self._spam_patterns:
-            if pattern.search(text_lower):
-                score *= 0.3
-                flags.append("spam_pattern_detected")
-                break
+        if scan["spam"]:
+            score *= 0.3
+            flags.append("spam_pattern_detected")
         
         # Check 5: Product not used
-        for indicator in self.NOT_USED_INDICATORS:
-            if indicator in text_lower:
-                score *= 0.15
-                flags.append("product_not_used")
-                break
+        if scan["not_used"]:
+            score *= 0.15
+            flags.append("product_not_used")
         
         # Check 6: ALL CAPS (often spam or emotional)
-        if text.isupper() and len(text) > 10:
+        if scan["all_caps"]:
             score *= 0.6
             flags.append("all_caps")
         
@@ -156,24 +330,23 @@ class CredibilityScorer:
         # ============================================
         
         # Check 8: Mixed sentiment (sign of nuanced review)
-        has_mixed = any(word in text_lower for word in self.MIXED_SENTIMENT_WORDS)
-        if has_mixed:
+        if scan["mixed"]:
             score *= 1.2
             flags.append("mixed_sentiment_detected")
         
         # Check 9: Specific features mentioned
-        features_mentioned = sum(1 for p in self._feature_patterns if p.search(text_lower))
+        features_mentioned = scan["features_mentioned"]
         if features_mentioned >= 2:
             score *= 1.15
             flags.append(f"specific_features_{features_mentioned}")
         
         # Check 10: Detailed review (50+ words)
-        if word_count >= 50:
+        if scan["word_count"] >= 50:
             score *= 1.1
             flags.append("detailed_review")
         
         # Check 11: Very detailed (100+ words)
-        if word_count >= 100:
+        if scan["word_count"] >= 100:
             score *= 1.1
             flags.append("very_detailed")
         
@@ -183,6 +356,144 @@ class CredibilityScorer:
         
         return self._build_result(score, flags)
     
+    def _scan(self, text: str, features: Optional[ReviewFeatures] = None) -> dict:
+        """
+        Run the text-only checks for a review (regex/substring scans).
+        
+        Star/sentiment checks are left to the caller so they can be applied
+        per review (score) or over arrays (score_vec).
+        """
+        if features is None:
+            features = prepare(text)
+        
+        # Normalized views shared with the other analyzers
+        text = features.stripped
+        text_lower = features.stripped_lower
+        word_count = features.n_words
+        
+        scan = {
+            "empty": not text or word_count < 2,
+            "word_count": word_count,
+            "generic_phrase": False,
+            "very_short": False,
+            "short_review": False,
+            "spam": False,
+            "not_used": False,
+            "all_caps": False,
+            "mixed": False,
+            "features_mentioned": 0
+        }
+        if scan["empty"]:
+            return scan
+        
+        if word_count <= 5:
+            if text_lower.rstrip("!.") in self.GENERIC_PHRASES:
+                scan["generic_phrase"] = True
+            else:
+                scan["very_short"] = True
+        elif word_count <= 15:
+            scan["short_review"] = True
+        
+        (scan["spam"], scan["not_used"], scan["mixed"],
+         scan["features_mentioned"]) = self._find_patterns(text_lower)
+        scan["all_caps"] = text.isupper() and len(text) > 10
+        
+        return scan
+    
+    def score_vec(self, texts: list[str], stars, sentiment_scores,
+                  features: Optional[list] = None) -> dict:
+        """
+        Score many reviews at once.
+        
+        Text checks still run per review, but the multipliers, star-sentiment
+        check, clamp and classification are applied over arrays (in a
+        numba-compiled loop when available, else NumPy masks). Gives the
+        same scores/classes/flags as calling score() on each review.
+        
+        Args:
+            texts: Review texts
+            stars: Array-like of star ratings (1-5)
+            sentiment_scores: Array-like of sentiment scores (-1 to +1)
+            features: Optional list of prepare(text) bundles, one per text
+            
+        Returns:
+            Struct-of-arrays dict:
+                scores: float64 array (rounded to 3 places)
+                classifications: array of 'bot'/'low_effort'/'human'
+                flags: list of flag lists
+        """
+        if features is None:
+            features = [None] * len(texts)
+        scans = [self._scan(text, f) for text, f in zip(texts, features)]
+        stars = np.asarray(stars, dtype=np.float64)
+        sentiment = np.asarray(sentiment_scores, dtype=np.float64)
+        
+        def column(key, dtype=bool):
+            return np.fromiter((s[key] for s in scans), dtype=dtype, count=len(scans))
+        
+        empty = column("empty")
+        generic = column("generic_phrase")
+        very_short = column("very_short")
+        short = column("short_review")
+        spam = column("spam")
+        not_used = column("not_used")
+        all_caps = column("all_caps")
+        mismatch = ~empty & (np.abs(sentiment - (stars - 3) / 2) > 1.0)
+        mixed = column("mixed")
+        features = column("features_mentioned", np.int64)
+        word_count = column("word_count", np.int64)
+        
+        if NUMBA_AVAILABLE:
+            score = np.empty(len(scans))
+            codes = np.empty(len(scans), dtype=np.int8)
+            _score_kernel(empty, generic, very_short, short, spam, not_used, all_caps,
+                          mismatch, mixed, features, word_count, score, codes)
+            classifications = CLASSIFICATIONS[codes]
+        else:
+            # Apply multipliers in the same order as score()
+            score = np.ones(len(scans))
+            for mask, factor in (
+                (empty, 0.1), (generic, 0.2), (very_short, 0.5), (short, 0.7),
+                (spam, 0.3), (not_used, 0.15), (all_caps, 0.6), (mismatch, 0.7),
+                (mixed, 1.2), (features >= 2, 1.15),
+                (word_count >= 50, 1.1), (word_count >= 100, 1.1)
+            ):
+                score = np.where(mask, score * factor, score)
+            
+            score = np.clip(score, 0.0, 1.0)
+            classifications = np.where(score < 0.3, "bot", np.where(score < 0.6, "low_effort", "human"))
+        
+        flags = []
+        for scan, is_mismatch in zip(scans, mismatch.tolist()):
+            if scan["empty"]:
+                flags.append(["empty_review"])
+                continue
+            f = [name for name in ("generic_phrase", "very_short", "short_review") if scan[name]]
+            if scan["spam"]:
+                f.append("spam_pattern_detected")
+            if scan["not_used"]:
+                f.append("product_not_used")
+            if scan["all_caps"]:
+                f.append("all_caps")
+            if is_mismatch:
+                f.append("star_sentiment_mismatch")
+            if scan["mixed"]:
+                f.append("mixed_sentiment_detected")
+            if scan["features_mentioned"] >= 2:
+                f.append(f"specific_features_{scan['features_mentioned']}")
+            if scan["word_count"] >= 50:
+                f.append("detailed_review")
+            if scan["word_count"] >= 100:
+                f.append("very_detailed")
+            flags.append(f)
+        
+        return {
+            # Python round() to match score() exactly
+            "scores": np.array([round(x, 3) for x in score.tolist()]),
+            "classifications": classifications,
+            "flags": flags
+        }
+    
     def _build_result(self, score: float, flags: list) -> dict:
         """Build the result dictionary with classification."""
         # Clamp score to [0, 1]
@@ -216,16 +527,27 @@ class CredibilityScorer:
         results = []
         total = len(reviews)
         
-        for i, review in enumerate(reviews):
-            if show_progress and i % 100 == 0:
-                print(f"Scoring {i}/{total}...")
+        # Progress is time-gated (one line per second at most), which is
+        # already as few writes as a tqdm bar would make
+        progress = ProgressPrinter("Scoring", total, enabled=show_progress, every=1)
+        for start in range(0, total, SCORE_BATCH_CHUNK):
+            progress.update(start)
             
-            result = self.score(
-                text=review.get("text", ""),
-                stars=review.get("stars"),
-                sentiment_score=review.get("sentiment_score")
+            chunk = reviews[start:start + SCORE_BATCH_CHUNK]
+            # Missing stars/sentiment go in as NaN, which never trips the
+            # star-sentiment mismatch - the same as score() skipping it
+            batch = self.score_vec(
+                [review.get("text", "") for review in chunk],
+                [np.nan if review.get("stars") is None else review["stars"] for review in chunk],
+                [np.nan if review.get("sentiment_score") is None else review["sentiment_score"]
+                 for review in chunk]
+            )
+            results.extend(
+                {"score": score, "classification": classification, "flags": flags}
+                for score, classification, flags in zip(
+                    batch["scores"].tolist(), batch["classifications"].tolist(), batch["flags"]
+                )
             )
-            results.append(result)
         
         if show_progress:
             print(f"Completed {total} reviews.")
@@ -17,11 +17,30 @@ import re
 import time
 import json
 import os
+import asyncio
+import importlib.util
 import requests
 from typing import List, Optional, Dict
 from pathlib import Path
 from urllib.parse import urlparse
 
+# Try importing httpx (optional, async client for multi-page ScraperAPI fetches)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# Try importing selectolax (optional, C HTML parser for review pages)
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
 # Firecrawl API configuration
 FIRECRAWL_API_KEY = os.environ.get("FIRECRAWL_API_KEY", "fc-442ed1832033402e86f569b40c8b36f1")
 FIRECRAWL_API_URL = "https://api.firecrawl.dev/v1/scrape"
@@ -30,6 +49,62 @@ FIRECRAWL_API_URL = "https://api.firecrawl.dev/v1/scrape"
 # Sign up at: https://www.scraperapi.com/
 SCRAPERAPI_KEY = os.environ.get("SCRAPERAPI_KEY", "")  # User must provide their own key
 SCRAPERAPI_AMAZON_REVIEWS_URL = "https://api.scraperapi.com/structured/amazon/review"
+SCRAPERAPI_TIMEOUT = 60  # ScraperAPI can take time for complex pages
+SCRAPERAPI_MAX_CONNECTIONS = 20
+
+# Parsed ScraperAPI pages are kept on disk, keyed by (asin, domain, page), so
+# re-scrapes within the TTL - also after a restart - cost no credits.
+# Set SCRAPERAPI_CACHE_DIR="" to disable.
+SCRAPERAPI_CACHE_DIR = os.environ.get("SCRAPERAPI_CACHE_DIR", ".tmp/scraperapi")
+SCRAPERAPI_CACHE_TTL = int(os.environ.get("SCRAPERAPI_CACHE_TTL", "86400"))
+
+# URL and review-page HTML patterns, compiled once for the process
+_ASIN_DP = re.compile(r'/dp/([A-Z0-9]{10})', re.IGNORECASE)  # Most common: /dp/ASIN
+_ASIN_FALLBACKS = [re.compile(p, re.IGNORECASE) for p in (
+    r'/gp/product/([A-Z0-9]{10})',    # Alternate: /gp/product/ASIN
+    r'/product/([A-Z0-9]{10})',       # Short: /product/ASIN
+    r'/ASIN/([A-Z0-9]{10})',          # Rare: /ASIN/ASIN
+    r'([A-Z0-9]{10})(?:[/?]|$)',      # Fallback: any 10-char code
+)]
+
+# Each review is in a div with data-hook="review". The field patterns stay
+# separate searches: a fused alternation run with finditer consumes text
+# (the rating sits inside the title anchor, so "stars" would never match),
+# and making every branch a zero-width lookahead keeps results exact but
+# measured 5.5x slower, as each position tries all branches instead of
+# re's literal-prefix scan per pattern
+_REVIEW_START_RE = re.compile(r'<div[^>]*data-hook="review"')
+_STARS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*out of\s*5\s*stars', re.IGNORECASE)
+_REVIEW_TITLE_RE = re.compile(r'data-hook="review-title"[^>]*>.*?<span[^>]*>(.+?)</span>', re.DOTALL)
+_REVIEW_BODY_RE = re.compile(r'data-hook="review-body"[^>]*>.*?<span[^>]*>(.+?)</span>', re.DOTALL)
+_REVIEWER_RE = re.compile(r'class="a-profile-name">([^<]+)</span>')
+_REVIEW_DATE_RE = re.compile(r'data-hook="review-date"[^>]*>([^<]+)')
+_HELPFUL_RE = re.compile(r'(\d+)\s*people?\s*found this helpful', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Product info on the reviews page
+_PAGE_TITLE_RE = re.compile(r'<title>([^<]+)</title>')
+_AMAZON_SUFFIX_RE = re.compile(r'\s*-\s*Amazon.*$')
+_REVIEWS_SUFFIX_RE = re.compile(r'\s*:\s*Customer reviews.*$', re.IGNORECASE)
+_AVERAGE_RATING_RE = re.compile(r'(\d+(?:\.\d+)?)\s*out of\s*5')
+_TOTAL_RATINGS_RE = re.compile(r'([\d,]+)\s*(?:global\s*)?ratings?', re.IGNORECASE)
+
+
+def _split_review_blocks(html: str) -> List[str]:
+    """
+    Cut a reviews page into one slice per review div.
+    
+    Same blocks as findall(r'<div[^>]*data-hook="review"[^>]*>.*?(?=<div[^>]*data-hook="review"|$)',
+    re.DOTALL), but from one scan for the opening tags and string slices,
+    instead of a lazy .*? retrying the lookahead at every character of the
+    page. A block starts only where its opening tag closes (some '>' after
+    the match) and the last one stops before a trailing newline, as $ did.
+    """
+    starts = list(_REVIEW_START_RE.finditer(html))
+    end = len(html) - 1 if html.endswith("\n") else len(html)
+    stops = [m.start() for m in starts[1:]] + [end]
+    last_gt = html.rfind(">")
+    return [html[m.start():stop] for m, stop in zip(starts, stops) if last_gt >= m.end()]
 
 
 def scrape_with_scraperapi(asin: str, domain: str = "amazon.com", page: int = 1) -> Optional[List[Dict]]:
@@ -53,40 +128,20 @@ def scrape_with_scraperapi(asin: str, domain: str = "amazon.com", page: int = 1)
         print("ScraperAPI key not configured. Set SCRAPERAPI_KEY environment variable.")
         return None
     
+    cached = _read_page_cache(asin, domain, page)
+    if cached is not None:
+        return cached
+    
     try:
-        # Build the API URL with parameters
-        params = {
-            "api_key": SCRAPERAPI_KEY,
-            "asin": asin,
-            "country": _get_country_code(domain),
-            "tld": _get_tld(domain),
-            "page": page
-        }
-        
         response = requests.get(
             SCRAPERAPI_AMAZON_REVIEWS_URL,
-            params=params,
-            timeout=60  # ScraperAPI can take time for complex pages
+            params=_scraperapi_params(asin, domain, page),
+            timeout=SCRAPERAPI_TIMEOUT
         )
         
         if response.status_code == 200:
-            data = response.json()
-            
-            # ScraperAPI returns structured review data
-            reviews = []
-            for review_data in data.get("reviews", []):
-                review = {
-                    "stars": float(review_data.get("rating", 3)),
-                    "title": review_data.get("title", ""),
-                    "text": review_data.get("body", "") or review_data.get("review", ""),
-                    "reviewer": review_data.get("author", ""),
-                    "date": review_data.get("date", ""),
-                    "verified": review_data.get("verified_purchase", False),
-                    "helpful_votes": review_data.get("helpful_count", 0)
-                }
-                if review["text"]:
-                    reviews.append(review)
-            
+            reviews = _parse_scraperapi_reviews(response.json())
+            _write_page_cache(asin, domain, page, reviews)
             return reviews
         
         print(f"ScraperAPI error: {response.status_code} - {response.text[:200]}")
@@ -97,29 +152,163 @@ def scrape_with_scraperapi(asin: str, domain: str = "amazon.com", page: int = 1)
         return None
 
 
+async def scrape_with_scraperapi_async(asin: str, domain: str = "amazon.com", pages: int = 1) -> Optional[List[Dict]]:
+    """
+    Fetch review pages 1..pages from ScraperAPI concurrently.
+    
+    All pages are requested at once over one httpx.AsyncClient, so the wait
+    is roughly that of the slowest page rather than the sum. Without httpx
+    the pages go through scrape_with_scraperapi on worker threads instead.
+    Pages still in the disk cache are not requested again.
+    
+    Args:
+        asin: Amazon product ASIN
+        domain: Amazon domain (amazon.com, amazon.in, etc.)
+        pages: Number of review pages to fetch
+        
+    Returns:
+        Reviews of all pages that succeeded in page order, or None if every
+        page failed
+    """
+    if not SCRAPERAPI_KEY:
+        print("ScraperAPI key not configured. Set SCRAPERAPI_KEY environment variable.")
+        return None
+    
+    page_numbers = range(1, max(1, pages) + 1)
+    results = {page: _read_page_cache(asin, domain, page) for page in page_numbers}
+    missing = [page for page in page_numbers if results[page] is None]
+    
+    if missing and not HTTPX_AVAILABLE:
+        fetched = await asyncio.gather(*[
+            asyncio.to_thread(scrape_with_scraperapi, asin, domain, page)
+            for page in missing
+        ])
+        results.update(zip(missing, fetched))
+    elif missing:
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=SCRAPERAPI_MAX_CONNECTIONS),
+            timeout=SCRAPERAPI_TIMEOUT
+        ) as client:
+            responses = await asyncio.gather(*[
+                client.get(SCRAPERAPI_AMAZON_REVIEWS_URL, params=_scraperapi_params(asin, domain, page))
+                for page in missing
+            ], return_exceptions=True)
+        
+        for page, response in zip(missing, responses):
+            if isinstance(response, Exception):
+                print(f"ScraperAPI request failed (page {page}): {response}")
+            elif response.status_code != 200:
+                print(f"ScraperAPI error (page {page}): {response.status_code} - {response.text[:200]}")
+            else:
+                try:
+                    results[page] = _parse_scraperapi_reviews(response.json())
+                except Exception as e:
+                    print(f"ScraperAPI response parse failed (page {page}): {e}")
+                    continue
+                _write_page_cache(asin, domain, page, results[page])
+    
+    page_results = [results[page] for page in page_numbers]
+    if all(result is None for result in page_results):
+        return None
+    return [review for result in page_results if result for review in result]
+
+
+def _page_cache_path(asin: str, domain: str, page: int) -> Optional[Path]:
+    """Disk cache file for one ScraperAPI page, or None if caching is off."""
+    if not SCRAPERAPI_CACHE_DIR:
+        return None
+    safe_domain = re.sub(r'[^A-Za-z0-9.-]', '_', domain)
+    return Path(SCRAPERAPI_CACHE_DIR) / f"{asin}_{safe_domain}_{page}.json"
+
+
+def _read_page_cache(asin: str, domain: str, page: int) -> Optional[List[Dict]]:
+    """Cached reviews of one page if present and within SCRAPERAPI_CACHE_TTL."""
+    path = _page_cache_path(asin, domain, page)
+    if path is None:
+        return None
+    try:
+        if time.time() - path.stat().st_mtime > SCRAPERAPI_CACHE_TTL:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_page_cache(asin: str, domain: str, page: int, reviews: List[Dict]) -> None:
+    """Store one page's parsed reviews (temp file + rename, so readers never see half a file)."""
+    path = _page_cache_path(asin, domain, page)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(reviews, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not cache ScraperAPI page: {e}")
+
+
+def _scraperapi_params(asin: str, domain: str, page: int) -> Dict:
+    """Query parameters for one ScraperAPI review page."""
+    return {
+        "api_key": SCRAPERAPI_KEY,
+        "asin": asin,
+        "country": _get_country_code(domain),
+        "tld": _get_tld(domain),
+        "page": page
+    }
+
+
+def _parse_scraperapi_reviews(data: Dict) -> List[Dict]:
+    """Convert ScraperAPI structured review data into review dicts (text required)."""
+    reviews = []
+    for review_data in data.get("reviews", []):
+        review = {
+            "stars": float(review_data.get("rating", 3)),
+            "title": review_data.get("title", ""),
+            "text": review_data.get("body", "") or review_data.get("review", ""),
+            "reviewer": review_data.get("author", ""),
+            "date": review_data.get("date", ""),
+            "verified": review_data.get("verified_purchase", False),
+            "helpful_votes": review_data.get("helpful_count", 0)
+        }
+        if review["text"]:
+            reviews.append(review)
+    
+    return reviews
+
+
+# Amazon domain -> ScraperAPI country code
+_COUNTRY_TABLE = {
+    "www.amazon.com": "us",
+    "amazon.com": "us",
+    "www.amazon.in": "in",
+    "amazon.in": "in",
+    "www.amazon.co.uk": "uk",
+    "amazon.co.uk": "uk",
+    "www.amazon.de": "de",
+    "amazon.de": "de",
+    "www.amazon.fr": "fr",
+    "amazon.fr": "fr",
+    "www.amazon.ca": "ca",
+    "amazon.ca": "ca",
+    "www.amazon.co.jp": "jp",
+    "amazon.co.jp": "jp",
+}
+
+
 def _get_country_code(domain: str) -> str:
     """Get country code from Amazon domain."""
-    domain_to_country = {
-        "www.amazon.com": "us",
-        "amazon.com": "us",
-        "www.amazon.in": "in",
-        "amazon.in": "in",
-        "www.amazon.co.uk": "uk",
-        "amazon.co.uk": "uk",
-        "www.amazon.de": "de",
-        "amazon.de": "de",
-        "www.amazon.fr": "fr",
-        "amazon.fr": "fr",
-        "www.amazon.ca": "ca",
-        "amazon.ca": "ca",
-        "www.amazon.co.jp": "jp",
-        "amazon.co.jp": "jp",
-    }
-    return domain_to_country.get(domain, "us")
+    return _COUNTRY_TABLE.get(domain, "us")
 
 
 def _get_tld(domain: str) -> str:
     """Get TLD from Amazon domain."""
+    # A precompiled regex over the same suffixes measured slower (330ns vs
+    # 190ns) than these `in` checks on real domains, so they stay
     if ".co.uk" in domain:
         return "co.uk"
     elif ".co.jp" in domain:
@@ -188,20 +377,20 @@ def extract_asin(url: str) -> Optional[str]:
         return None
     
     # ASIN is always 10 characters, starts with B0 (usually) or is alphanumeric
-    patterns = [
-        r'/dp/([A-Z0-9]{10})',           # Most common: /dp/ASIN
-        r'/gp/product/([A-Z0-9]{10})',    # Alternate: /gp/product/ASIN
-        r'/product/([A-Z0-9]{10})',       # Short: /product/ASIN
-        r'/ASIN/([A-Z0-9]{10})',          # Rare: /ASIN/ASIN
-        r'([A-Z0-9]{10})(?:[/?]|$)',      # Fallback: any 10-char code
-    ]
+    match = _ASIN_DP.search(url)
+    if match:
+        asin = match.group(1).upper()
+        if asin.isascii():
+            return asin
     
-    for pattern in patterns:
-        match = re.search(pattern, url, re.IGNORECASE)
+    for pattern in _ASIN_FALLBACKS:
+        match = pattern.search(url)
         if match:
             asin = match.group(1).upper()
-            # Validate it looks like an ASIN
-            if re.match(r'^[A-Z0-9]{10}$', asin):
+            # Validate it looks like an ASIN: the group is 10 [A-Z0-9] chars,
+            # but IGNORECASE also admits U+0130 and U+212A, which stay
+            # non-ASCII after upper() (same check as ^[A-Z0-9]{10}$)
+            if asin.isascii():
                 return asin
     
     return None
@@ -231,50 +420,110 @@ class AmazonScraper:
     def _parse_review_html(self, html: str) -> List[Dict]:
         """
         Parse reviews from Amazon HTML.
-        Uses regex patterns since Amazon's HTML structure is consistent.
+        Uses selectolax's DOM parser when available, else regex patterns.
+        """
+        if SELECTOLAX_AVAILABLE:
+            try:
+                return self._parse_review_dom(html)
+            except Exception as e:
+                print(f"Warning: selectolax parse failed, falling back to regex: {e}")
+        return self._parse_review_regex(html)
+    
+    def _parse_review_dom(self, html: str) -> List[Dict]:
+        """
+        Parse reviews with one selectolax pass over the page.
+        
+        Same fields and skip rules as the regex parser, but text comes from
+        the DOM, so entities are decoded and attributes containing '>' or
+        nested markup don't leak into titles and bodies.
         """
         reviews = []
         
-        # Pattern for individual reviews
-        # Each review is in a div with data-hook="review"
-        review_pattern = r'data-hook="review"[^>]*>(.*?)</div>\s*</div>\s*</div>\s*</div>'
+        for node in HTMLParser(html).css('div[data-hook="review"]'):
+            review = {}
+            block_text = node.text(separator=' ')
+            
+            # Extract star rating (prefer the rating icon over the free text)
+            star_node = node.css_first('[data-hook="review-star-rating"], [data-hook="cmps-review-star-rating"]')
+            star_match = _STARS_RE.search(star_node.text() if star_node else block_text)
+            if star_match is None and star_node:
+                star_match = _STARS_RE.search(block_text)
+            if star_match:
+                review['stars'] = float(star_match.group(1))
+            else:
+                continue  # Skip reviews without ratings
+            
+            # Extract review title (the last non-empty span; the rating icon can come first)
+            title_node = node.css_first('[data-hook="review-title"]')
+            if title_node:
+                spans = [t for t in (span.text().strip() for span in title_node.css('span')) if t]
+                if spans:
+                    review['title'] = spans[-1]
+            
+            # Extract review text
+            body_node = node.css_first('[data-hook="review-body"] span') or node.css_first('[data-hook="review-body"]')
+            body = body_node.text().strip() if body_node else ''
+            review['text'] = body or review.get('title', '')
+            
+            # Extract reviewer name
+            name_node = node.css_first('.a-profile-name')
+            if name_node:
+                review['reviewer'] = name_node.text().strip()
+            
+            # Extract date
+            date_node = node.css_first('[data-hook="review-date"]')
+            if date_node:
+                review['date'] = date_node.text().strip()
+            
+            # Extract verified purchase
+            review['verified'] = 'Verified Purchase' in block_text
+            
+            # Extract helpful votes
+            helpful_match = _HELPFUL_RE.search(block_text)
+            review['helpful_votes'] = int(helpful_match.group(1)) if helpful_match else 0
+            
+            if review.get('text'):
+                reviews.append(review)
+        
+        return reviews
+    
+    def _parse_review_regex(self, html: str) -> List[Dict]:
+        """Parse reviews with regex patterns (fallback without selectolax)."""
+        reviews = []
         
         # Find all review blocks
-        review_blocks = re.findall(r'<div[^>]*data-hook="review"[^>]*>.*?(?=<div[^>]*data-hook="review"|$)', 
-                                   html, re.DOTALL)
+        review_blocks = _split_review_blocks(html)
         
         for block in review_blocks:
             try:
                 review = {}
                 
                 # Extract star rating
-                star_match = re.search(r'(\d+(?:\.\d+)?)\s*out of\s*5\s*stars', block, re.IGNORECASE)
+                star_match = _STARS_RE.search(block)
                 if star_match:
                     review['stars'] = float(star_match.group(1))
                 else:
                     continue  # Skip reviews without ratings
                 
                 # Extract review title
-                title_match = re.search(r'data-hook="review-title"[^>]*>.*?<span[^>]*>(.+?)</span>', 
-                                       block, re.DOTALL)
+                title_match = _REVIEW_TITLE_RE.search(block)
                 if title_match:
-                    review['title'] = re.sub(r'<[^>]+>', '', title_match.group(1)).strip()
+                    review['title'] = _TAG_RE.sub('', title_match.group(1)).strip()
                 
                 # Extract review text
-                text_match = re.search(r'data-hook="review-body"[^>]*>.*?<span[^>]*>(.+?)</span>', 
-                                      block, re.DOTALL)
+                text_match = _REVIEW_BODY_RE.search(block)
                 if text_match:
-                    review['text'] = re.sub(r'<[^>]+>', '', text_match.group(1)).strip()
+                    review['text'] = _TAG_RE.sub('', text_match.group(1)).strip()
                 else:
                     review['text'] = review.get('title', '')
                 
                 # Extract reviewer name
-                name_match = re.search(r'class="a-profile-name">([^<]+)</span>', block)
+                name_match = _REVIEWER_RE.search(block)
                 if name_match:
                     review['reviewer'] = name_match.group(1).strip()
                 
                 # Extract date
-                date_match = re.search(r'data-hook="review-date"[^>]*>([^<]+)', block)
+                date_match = _REVIEW_DATE_RE.search(block)
                 if date_match:
                     review['date'] = date_match.group(1).strip()
                 
@@ -282,7 +531,7 @@ class AmazonScraper:
                 review['verified'] = 'Verified Purchase' in block
                 
                 # Extract helpful votes
-                helpful_match = re.search(r'(\d+)\s*people?\s*found this helpful', block, re.IGNORECASE)
+                helpful_match = _HELPFUL_RE.search(block)
                 if helpful_match:
                     review['helpful_votes'] = int(helpful_match.group(1))
                 else:
@@ -305,21 +554,21 @@ class AmazonScraper:
         info = {}
         
         # Product title
-        title_match = re.search(r'<title>([^<]+)</title>', html)
+        title_match = _PAGE_TITLE_RE.search(html)
         if title_match:
             title = title_match.group(1)
             # Clean up Amazon's title format
-            title = re.sub(r'\s*-\s*Amazon.*$', '', title)
-            title = re.sub(r'\s*:\s*Customer reviews.*$', '', title, flags=re.IGNORECASE)
+            title = _AMAZON_SUFFIX_RE.sub('', title)
+            title = _REVIEWS_SUFFIX_RE.sub('', title)
             info['title'] = title.strip()
         
         # Average rating
-        rating_match = re.search(r'(\d+(?:\.\d+)?)\s*out of\s*5', html)
+        rating_match = _AVERAGE_RATING_RE.search(html)
         if rating_match:
             info['average_rating'] = float(rating_match.group(1))
         
         # Total reviews
-        total_match = re.search(r'([\d,]+)\s*(?:global\s*)?ratings?', html, re.IGNORECASE)
+        total_match = _TOTAL_RATINGS_RE.search(html)
         if total_match:
             info['total_reviews'] = int(total_match.group(1).replace(',', ''))
         
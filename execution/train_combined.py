@@ -17,8 +17,11 @@ import os
 import json
 import gzip
 import random
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -29,38 +32,74 @@ from execution.train_model import (
 )
 
 
+def _load_dataset_worker(path: str, max_samples: int, seed: int, decode_threads: int) -> tuple:
+    """load_training_data in a pool process, on its own random stream."""
+    # Forked workers inherit the parent's random state; without a reseed
+    # every file would draw the same reservoir/shuffle sequence
+    random.seed(seed)
+    return load_training_data(path, max_samples, decode_threads=decode_threads, show_progress=False)
+
+
 def load_multiple_datasets(data_paths: list, max_per_dataset: int = 5000) -> tuple:
-    """Load and combine samples from multiple datasets."""
+    """
+    Load and combine samples from multiple datasets.
+    
+    Files are independent gzip+JSON passes, so each one loads in its own
+    process; wall time is the slowest file instead of the sum. Each worker
+    gets a distinct seed (drawn from the parent's random state, so seeding
+    the parent still reproduces a run) and its share of the cores for
+    decoding. Results are merged and reported in data_paths order.
+    """
     all_texts = []
     all_labels = []
     
+    paths = []
     for path in data_paths:
         if not Path(path).exists():
             print(f"⚠️  Skipping missing: {path}")
             continue
-        
-        print(f"\n📦 Loading: {path}")
-        texts, labels = load_training_data(path, max_samples=max_per_dataset)
-        all_texts.extend(texts)
-        all_labels.extend(labels)
+        paths.append(path)
+    
+    if paths:
+        workers = min(len(paths), os.cpu_count() or 1)
+        decode_threads = max(1, (os.cpu_count() or 1) // workers)
+        base_seed = random.getrandbits(32)
+        print(f"\n📦 Loading {len(paths)} dataset(s) in {workers} process(es)...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_load_dataset_worker, path, max_per_dataset, base_seed + i, decode_threads)
+                for i, path in enumerate(paths)
+            ]
+            for path, future in zip(paths, futures):
+                texts, labels = future.result()
+                counts = np.bincount(np.asarray(labels, dtype=np.int64), minlength=3)
+                print(f"\n📦 {path}")
+                print(f"  Loaded {len(texts)} samples")
+                print(f"  Negative (1-2★): {counts[0]}")
+                print(f"  Neutral (3★): {counts[1]}")
+                print(f"  Positive (4-5★): {counts[2]}")
+                all_texts.extend(texts)
+                all_labels.extend(labels)
     
-    # Shuffle combined data
-    combined = list(zip(all_texts, all_labels))
-    random.shuffle(combined)
-    all_texts, all_labels = zip(*combined)
+    # Shuffle combined data with one index permutation (no pair tuples)
+    labels_arr = np.asarray(all_labels, dtype=np.int8)
+    idx = np.random.default_rng(random.getrandbits(64)).permutation(labels_arr.size)
+    all_texts = [all_texts[i] for i in idx.tolist()]
+    labels_arr = labels_arr[idx]
+    counts = np.bincount(labels_arr, minlength=3)
     
     print(f"\n📊 Combined Dataset:")
     print(f"  Total samples: {len(all_texts)}")
-    print(f"  Negative: {all_labels.count(0)}")
-    print(f"  Neutral: {all_labels.count(1)}")
-    print(f"  Positive: {all_labels.count(2)}")
+    print(f"  Negative: {counts[0]}")
+    print(f"  Neutral: {counts[1]}")
+    print(f"  Positive: {counts[2]}")
     
-    return list(all_texts), list(all_labels)
+    return all_texts, labels_arr.tolist()
 
 
 def main():
     if not TRAINING_AVAILABLE:
-        print("❌ Missing dependencies. Install with: pip install torch transformers scikit-learn")
+        print("❌ Missing dependencies. Install with: pip install torch transformers")
         sys.exit(1)
     
     # Datasets to combine
@@ -0,0 +1,62 @@
+"""Parity of the vectorized rating path with calculate()."""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "execution"))
+
+import calculate_weighted_rating
+from calculate_weighted_rating import WeightedRatingCalculator
+
+
+class CalculateVecParityTest(unittest.TestCase):
+    def setUp(self):
+        self.calculator = WeightedRatingCalculator()
+        rng = np.random.default_rng(0)
+        n = 200_000
+        self.stars = rng.integers(1, 6, n)
+        self.sentiment = rng.uniform(-1.0, 1.0, n)
+        self.credibility = rng.uniform(0.0, 1.0, n)
+        self.is_sarcastic = rng.random(n) < 0.3
+        self.sarcasm_confidence = rng.uniform(0.0, 1.0, n)
+        # Rounding tie found in review: np.round gave 1.98, round() 1.99
+        self.stars[0], self.sentiment[0], self.credibility[0] = 1, -1.0, 0.006
+
+    def expected(self):
+        return [
+            self.calculator.calculate_rating(int(s), float(se), float(c), bool(sa), float(sc))
+            for s, se, c, sa, sc in zip(self.stars, self.sentiment, self.credibility,
+                                        self.is_sarcastic, self.sarcasm_confidence)
+        ]
+
+    def vec(self):
+        return self.calculator.calculate_vec(
+            self.stars, self.sentiment, self.credibility,
+            self.is_sarcastic, self.sarcasm_confidence
+        ).tolist()
+
+    def test_matches_calculate_rating(self):
+        self.assertEqual(self.vec(), self.expected())
+        self.assertEqual(self.vec()[0], 1.99)
+
+    def test_matches_calculate_without_numba(self):
+        available = calculate_weighted_rating.NUMBA_AVAILABLE
+        calculate_weighted_rating.NUMBA_AVAILABLE = False
+        try:
+            self.assertEqual(self.vec(), self.expected())
+        finally:
+            calculate_weighted_rating.NUMBA_AVAILABLE = available
+
+    def test_calculate_rating_matches_calculate(self):
+        for i in range(2000):
+            args = (int(self.stars[i]), float(self.sentiment[i]), float(self.credibility[i]),
+                    bool(self.is_sarcastic[i]), float(self.sarcasm_confidence[i]))
+            self.assertEqual(self.calculator.calculate_rating(*args),
+                             self.calculator.calculate(*args)["adjusted_rating"])
+
+
+if __name__ == "__main__":
+    unittest.main()